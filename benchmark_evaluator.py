@@ -0,0 +1,182 @@
+"""
+Verificación y benchmark de los evaluadores de manos
+Comprueba casos límite, enumera las 2.598.960 manos de 5 cartas, compara las frecuencias
+de cada tipo de mano con los conteos combinatorios conocidos y mide manos por segundo
+de cada evaluador según el número de cartas (5, 6 y 7).
+
+Uso:
+    python benchmark_evaluator.py
+    python benchmark_evaluator.py --backends reference,lookup --samples 200000 --skip-exhaustive
+"""
+
+import argparse
+import itertools
+import math
+import sys
+import time
+from collections import Counter
+
+from poker_probability_calculator import (EVALUATOR_BACKENDS, PokerHandEvaluator, ProbabilityCalculator,
+                                          cards_to_ints, get_evaluator, random_hands, verify_evaluators)
+
+HAND_NAMES = ProbabilityCalculator.HAND_NAMES
+
+# Número exacto de manos de cada tipo (5 cartas: C(52,5), 7 cartas: C(52,7))
+FIVE_CARD_COUNTS = {
+    10: 4, 9: 36, 8: 624, 7: 3744, 6: 5108,
+    5: 10200, 4: 54912, 3: 123552, 2: 1098240, 1: 1302540
+}
+SEVEN_CARD_COUNTS = {
+    10: 4324, 9: 37260, 8: 224848, 7: 3473184, 6: 4047644,
+    5: 6180020, 4: 6461620, 3: 31433400, 2: 58627800, 1: 23294460
+}
+
+# Casos límite: (cartas, tipo de mano esperado, kickers esperados)
+EDGE_CASES = [
+    (['A♠', '2♥', '3♦', '4♣', '5♠', '9♥', 'K♦'], 5, [5]),               # Wheel
+    (['A♠', '2♥', '3♦', '4♣', '5♠', '6♥', 'K♦'], 5, [6]),               # 6 alta, no wheel
+    (['5♠', '6♥', '7♦', '8♣', '9♠', 'T♥', '2♦'], 5, [10]),              # La escalera más alta
+    (['A♠', '2♠', '3♠', '4♠', '5♠', '9♥', 'K♦'], 9, [5]),               # Escalera de color al 5
+    (['9♥', '8♥', '7♥', '6♥', '5♥', '4♥', 'A♥'], 9, [9]),               # Escalera de color + color extra
+    (['A♠', 'K♠', 'Q♠', 'J♠', 'T♠', '9♠', '2♥'], 10, [14]),             # Real con carta extra del palo
+    (['2♥', '4♥', '6♥', '9♥', 'J♥', '3♠', '5♦'], 6, [11, 9, 6, 4, 2]),   # Color + escalera de otros palos
+    (['A♠', 'A♥', 'A♦', 'A♣', '2♠', '2♥', 'K♦'], 8, [14, 13]),          # Kicker del poker
+    (['2♠', '2♥', '2♦', '3♣', '3♠', '3♥', 'A♠'], 7, [3, 2]),            # Dos tríos
+    (['K♠', 'K♥', '7♦', '7♣', '4♠', '4♥', '9♦'], 3, [13, 7, 9]),        # Tres parejas
+    (['T♠', 'J♥', 'Q♦', 'K♣', 'A♠'], 5, [14]),                          # Escalera al As, 5 cartas
+]
+
+
+def check_edge_cases(evaluator) -> int:
+    """Comprueba los casos límite y retorna el número de fallos"""
+    failures = 0
+    for cards, rank, kickers in EDGE_CASES:
+        hand = cards_to_ints(cards)
+        expected = PokerHandEvaluator.hand_strength(rank, kickers)
+        strength = evaluator.evaluate_many([hand])[0]
+        if strength != expected:
+            failures += 1
+            got_rank = PokerHandEvaluator.hand_category(strength)
+            print(f"  FALLO {' '.join(cards)}: esperado {HAND_NAMES[rank]} {kickers}, "
+                  f"obtenido {HAND_NAMES.get(got_rank, got_rank)} ({strength:#x})")
+    return failures
+
+
+def count_categories(evaluator, hands, chunk_size: int = 50000) -> Counter:
+    """Cuenta cuántas manos hay de cada tipo"""
+    counts = Counter()
+    hands = iter(hands)
+    while True:
+        chunk = list(itertools.islice(hands, chunk_size))
+        if not chunk:
+            break
+        for strength in evaluator.evaluate_many(chunk):
+            counts[strength >> PokerHandEvaluator.CATEGORY_SHIFT] += 1
+    return counts
+
+
+def check_exhaustive_five_cards(evaluator) -> int:
+    """Enumera todas las manos de 5 cartas y compara con los conteos exactos"""
+    start = time.perf_counter()
+    counts = count_categories(evaluator, itertools.combinations(range(52), 5))
+    elapsed = time.perf_counter() - start
+    failures = 0
+    for rank in sorted(FIVE_CARD_COUNTS, reverse=True):
+        status = "ok" if counts[rank] == FIVE_CARD_COUNTS[rank] else "FALLO"
+        if status != "ok":
+            failures += 1
+        print(f"  {HAND_NAMES[rank]:<18} {counts[rank]:>9} / {FIVE_CARD_COUNTS[rank]:>9}  {status}")
+    print(f"  {sum(counts.values())} manos en {elapsed:.1f} s")
+    return failures
+
+
+def check_seven_card_sample(evaluator, hands, max_z: float = 5.0) -> int:
+    """Compara las frecuencias de una muestra de 7 cartas con las probabilidades exactas"""
+    counts = count_categories(evaluator, hands)
+    total = len(hands)
+    all_hands = sum(SEVEN_CARD_COUNTS.values())
+    failures = 0
+    for rank in sorted(SEVEN_CARD_COUNTS, reverse=True):
+        p = SEVEN_CARD_COUNTS[rank] / all_hands
+        expected = p * total
+        z = (counts[rank] - expected) / math.sqrt(total * p * (1 - p))
+        status = "ok" if abs(z) <= max_z else "FALLO"
+        if status != "ok":
+            failures += 1
+        print(f"  {HAND_NAMES[rank]:<18} {counts[rank] / total:>9.5f} / {p:.5f}  z={z:+.2f}  {status}")
+    return failures
+
+
+def benchmark(evaluator, hands_by_size) -> None:
+    """Mide manos por segundo para cada número de cartas"""
+    for size, hands in hands_by_size.items():
+        start = time.perf_counter()
+        evaluator.evaluate_many(hands)
+        elapsed = time.perf_counter() - start
+        print(f"  {size} cartas: {len(hands) / elapsed:>12,.0f} manos/s")
+
+    # Ruta usada por la simulación: mesa precalculada + 2 cartas por jugador
+    hands = hands_by_size.get(7)
+    if hands:
+        start = time.perf_counter()
+        for hand in hands:
+            evaluator.evaluate_with_board(evaluator.board_state(hand[:5]), hand[5], hand[6])
+        elapsed = time.perf_counter() - start
+        print(f"  mesa + 2 cartas: {len(hands) / elapsed:>9,.0f} manos/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificación y benchmark de evaluadores de manos")
+    parser.add_argument('--backends', default=','.join(EVALUATOR_BACKENDS),
+                        help="Evaluadores separados por comas (por defecto: todos)")
+    parser.add_argument('--samples', type=int, default=1000000,
+                        help="Manos de 7 cartas aleatorias para verificar frecuencias")
+    parser.add_argument('--bench-hands', type=int, default=100000,
+                        help="Manos por tamaño para medir velocidad")
+    parser.add_argument('--skip-exhaustive', action='store_true',
+                        help="No enumerar las 2.598.960 manos de 5 cartas")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    evaluators = []
+    for name in args.backends.split(','):
+        try:
+            evaluators.append(get_evaluator(name))
+        except (ImportError, ValueError) as e:
+            print(f"Evaluador '{name}' no disponible: {e}")
+
+    seven_card_hands = random_hands(args.samples, sizes=(7,), seed=args.seed)
+    hands_by_size = {size: random_hands(args.bench_hands, sizes=(size,), seed=args.seed + size)
+                     for size in (5, 6, 7)}
+
+    failures = 0
+    for evaluator in evaluators:
+        print(f"\n=== {evaluator.name} ===")
+        print("Casos límite:")
+        failures += check_edge_cases(evaluator)
+        if not args.skip_exhaustive:
+            print("Todas las manos de 5 cartas:")
+            failures += check_exhaustive_five_cards(evaluator)
+        print(f"Muestra de {args.samples} manos de 7 cartas:")
+        failures += check_seven_card_sample(evaluator, seven_card_hands)
+        print("Velocidad:")
+        benchmark(evaluator, hands_by_size)
+
+    # Comprobación diferencial de cada evaluador contra el de referencia
+    reference = get_evaluator('reference')
+    for evaluator in evaluators:
+        if evaluator.name == reference.name:
+            continue
+        report = verify_evaluators(reference, evaluator, seven_card_hands)
+        print(f"\n{reference.name} vs {evaluator.name}: {report['hands']} manos, "
+              f"{report['mismatches']} diferencias")
+        for example in report['examples']:
+            print(f"  {example}")
+        failures += report['mismatches']
+
+    print("\nTodo correcto" if failures == 0 else f"\n{failures} fallos")
+    return 0 if failures == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Generador de la tabla de equity preflop (preflop_equity_table.json)
+Simula cada una de las 169 manos iniciales contra 1-9 oponentes con manos aleatorias con
+ProbabilityCalculator.calculate_equity (con semilla, así la tabla es reproducible) y guarda
+las victorias y las 3 manos que más veces ganan. Como en calculate_equity, los empates
+cuentan como victorias.
+
+Uso:
+    python build_preflop_equity_table.py
+    python build_preflop_equity_table.py --simulations 50000 --output /tmp/preflop.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from poker_probability_calculator import (CARD_RANKS, PreflopEquityTable, PreflopStrategy,
+                                          ProbabilityCalculator, cards_to_ints, derive_seed,
+                                          get_evaluator, get_process_pool, process_pool_workers)
+
+MAX_OPPONENTS = PreflopEquityTable.MAX_OPPONENTS
+
+
+def preflop_hand_classes():
+    """Las 169 manos iniciales con una combinación representativa: {'AKs': ['A♠', 'K♠'], ...}"""
+    classes = {}
+    for i in range(len(CARD_RANKS) - 1, -1, -1):
+        for j in range(i, -1, -1):
+            high, low = CARD_RANKS[i], CARD_RANKS[j]
+            if i == j:
+                cards = [high + '♠', low + '♥']
+            else:
+                classes[PreflopStrategy.normalize_hand(high + '♠', low + '♠')] = [high + '♠', low + '♠']
+                cards = [high + '♠', low + '♥']
+            classes[PreflopStrategy.normalize_hand(*cards)] = cards
+    return classes
+
+
+def simulate_hand_class(evaluator_name: str, cards, simulations: int, seed: int):
+    """
+    Simula una mano contra 1-9 oponentes con calculate_equity
+    Retorna: lista (índice = oponentes - 1) de (victorias o empates, [(tipo de mano, derrotas), ...])
+    """
+    calculator = ProbabilityCalculator(evaluator_name, use_processes=False, use_preflop_table=False,
+                                       cache_size=0)
+    hand_ranks = {name: rank for rank, name in ProbabilityCalculator.HAND_NAMES.items()}
+    my_cards = cards_to_ints(cards)
+    results = []
+    for num_opponents in range(1, MAX_OPPONENTS + 1):
+        result = calculator.calculate_equity(my_cards, [], num_opponents + 1, simulations=simulations,
+                                             exact=False, seed=derive_seed(seed, num_opponents))
+        wins = round(result.probability * result.samples)
+        results.append((wins, [(hand_ranks[name], count) for name, count in result.top_losing_hands]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera la tabla de equity preflop (169 manos × 1-9 oponentes)")
+    parser.add_argument('--simulations', type=int, default=200000, help="Simulaciones por mano")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--evaluator', default='lookup', help="Evaluador a usar (por defecto 'lookup')")
+    parser.add_argument('--output', default=None,
+                        help=f"Archivo de salida (por defecto {PreflopEquityTable.TABLE_FILE} junto al programa)")
+    args = parser.parse_args()
+
+    output = args.output
+    if output is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        output = os.path.join(script_dir, PreflopEquityTable.TABLE_FILE)
+
+    # Cargar el evaluador aquí primero (genera su tabla si hace falta) antes de los procesos
+    get_evaluator(args.evaluator)
+    classes = preflop_hand_classes()
+    start = time.perf_counter()
+
+    if process_pool_workers() > 1:
+        pool = get_process_pool()
+        futures = {hand_class: pool.submit(simulate_hand_class, args.evaluator, cards, args.simulations,
+                                           derive_seed(args.seed, hand_class))
+                   for hand_class, cards in classes.items()}
+        results = {}
+        for hand_class, future in futures.items():
+            results[hand_class] = future.result()
+            print(f"  {hand_class:<4} ({len(results)}/{len(classes)})")
+    else:
+        results = {}
+        for hand_class, cards in classes.items():
+            results[hand_class] = simulate_hand_class(args.evaluator, cards, args.simulations,
+                                                      derive_seed(args.seed, hand_class))
+            print(f"  {hand_class:<4} ({len(results)}/{len(classes)})")
+
+    table = {
+        'metadata': {
+            'description': "Equity preflop contra oponentes con manos aleatorias. Para cada mano y "
+                           "número de oponentes (1-9): [victorias, empates, [[tipo de mano, derrotas], ...]] "
+                           "en número de simulaciones (los empates cuentan como victorias: empates = 0)",
+            'simulations': args.simulations,
+            'seed': args.seed,
+            'evaluator': args.evaluator,
+            'max_opponents': MAX_OPPONENTS,
+        },
+        'equity': {
+            hand_class: [[wins, 0, [list(item) for item in top_losing]]
+                         for wins, top_losing in results[hand_class]]
+            for hand_class in classes
+        },
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(table, f, separators=(',', ':'))
+        f.write('\n')
+
+    elapsed = time.perf_counter() - start
+    print(f"Tabla guardada en {output} ({len(classes)} manos, {args.simulations} simulaciones, {elapsed:.0f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
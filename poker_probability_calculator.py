@@ -8,16 +8,163 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import random
 import math
-from collections import Counter
-from typing import List, Tuple, Optional
+from collections import Counter, OrderedDict
+from typing import List, Tuple, Optional, NamedTuple
 from collections import Counter
 import threading
+import time
 import json
+import sqlite3
 import os
 import os
+import sys
+import mmap
+import struct
+import itertools
+import bisect
+import hashlib
+import multiprocessing
+from array import array
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor, wait
+
+try:
+    import numpy as np  # Opcional: solo para la evaluación por lotes
+except ImportError:
+    np = None
+
+# Modelo de cartas enteras: carta = índice_de_rango * 4 + índice_de_palo (0-51)
+# El texto ('T♠', '10♥', 'As') solo se usa en la interfaz; el cálculo trabaja con enteros
+CARD_RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
+CARD_SUIT_SYMBOLS = ['♠', '♥', '♦', '♣']
+CARD_VALUES = [card // 4 + 2 for card in range(52)]  # Valor del rango (2-14)
+CARD_SUITS = [card % 4 for card in range(52)]  # Índice del palo (0-3)
+CARD_NAMES = [rank + suit for rank in CARD_RANKS for suit in CARD_SUIT_SYMBOLS]
+CARD_INDEX = {name: card for card, name in enumerate(CARD_NAMES)}
+# Aceptar también palos en letra ('As', 'Kh', '7d', 'Tc')
+for _card, _name in enumerate(CARD_NAMES):
+    CARD_INDEX[_name[0] + 'shdc'[CARD_SUITS[_card]]] = _card
+
+
+def card_to_int(card) -> int:
+    """Convierte una carta en texto ('T♠', '10♠', 'As') a su índice entero (0-51)"""
+    if isinstance(card, int):
+        return card
+    if card.startswith('10'):
+        card = 'T' + card[2:]
+    return CARD_INDEX[card]
+
+
+def card_to_str(card: int) -> str:
+    """Convierte un índice entero (0-51) a su texto ('T♠')"""
+    return CARD_NAMES[card]
+
+
+def cards_to_ints(cards) -> List[int]:
+    """Convierte una lista de cartas (texto o enteros) a enteros"""
+    return [card_to_int(card) for card in cards]
+
+
+# Bitboards: una mano es un entero de 52 bits, 13 bits por palo (bit = palo * 13 + rango)
+CARD_BITS = [1 << ((card & 3) * 13 + (card >> 2)) for card in range(52)]
+FULL_DECK_MASK = (1 << 52) - 1
+SUIT_MASK = (1 << 13) - 1
+
+
+def cards_to_bitboard(cards: List[int]) -> int:
+    """Convierte una lista de cartas (enteros 0-51) en un bitboard de 52 bits"""
+    mask = 0
+    for card in cards:
+        mask |= CARD_BITS[card]
+    return mask
+
+
+def bitboard_to_cards(mask: int) -> List[int]:
+    """Convierte un bitboard en la lista de cartas que contiene (orden 0-51)"""
+    return [card for card in range(52) if mask & CARD_BITS[card]]
+
+
+# Tablas sobre máscaras de 13 bits de rangos (bit i = rango CARD_RANKS[i])
+WHEEL_MASK = (1 << 12) | 0b1111  # A-2-3-4-5
+
+
+def _straight_high_from_mask(mask: int) -> int:
+    """Carta alta de la mejor escalera de la máscara (0 si no hay)"""
+    # Desplazar y AND: queda un bit por cada escalera, en su carta más baja
+    runs = mask & (mask >> 1) & (mask >> 2) & (mask >> 3) & (mask >> 4)
+    if runs:
+        return runs.bit_length() + 5
+    if (mask & WHEEL_MASK) == WHEEL_MASK:
+        return 5
+    return 0
+
+
+def _packed_top_values(mask: int) -> int:
+    """Valores de las 5 cartas más altas de la máscara, empaquetados en 4 bits cada uno"""
+    packed = 0
+    count = 0
+    for bit in range(12, -1, -1):
+        if mask & (1 << bit) and count < 5:
+            packed = (packed << 4) | (bit + 2)
+            count += 1
+    return packed << (4 * (5 - count))
+
+
+RANK_MASK_STRAIGHT_HIGH = [_straight_high_from_mask(mask) for mask in range(1 << 13)]
+RANK_MASK_HIGH_BIT = [mask.bit_length() - 1 for mask in range(1 << 13)]
+RANK_MASK_POPCOUNT = [bin(mask).count('1') for mask in range(1 << 13)]
+RANK_MASK_TOP_VALUES = [_packed_top_values(mask) for mask in range(1 << 13)]
+
+
+class BoardState:
+    """Estado precalculado de las cartas comunitarias, compartido por todos los jugadores"""
+    
+    __slots__ = ('cards', 'rank_counts', 'rank_mask', 'pairs_mask', 'trips_mask', 'quads_mask',
+                 'flush_suit', 'flush_count', 'flush_mask')
+    
+    def __init__(self, cards: List[int], track_suits: bool = True):
+        self.cards = cards
+        self.rank_counts = [0] * 13
+        suit_counts = [0] * 4
+        suit_masks = [0] * 4
+        for card in cards:
+            self.rank_counts[card >> 2] += 1
+        # Si ya se sabe que no puede haber color, no hace falta mirar los palos
+        if track_suits:
+            for card in cards:
+                suit_counts[card & 3] += 1
+                suit_masks[card & 3] |= 1 << (card >> 2)
+        
+        # Máscaras de rangos por número de apariciones
+        self.rank_mask = 0
+        self.pairs_mask = 0
+        self.trips_mask = 0
+        self.quads_mask = 0
+        for rank, count in enumerate(self.rank_counts):
+            if count:
+                self.rank_mask |= 1 << rank
+            if count == 2:
+                self.pairs_mask |= 1 << rank
+            elif count == 3:
+                self.trips_mask |= 1 << rank
+            elif count == 4:
+                self.quads_mask |= 1 << rank
+        
+        # Candidato a color: con 2 cartas propias solo puede completarse un palo con 3+ en la mesa
+        self.flush_suit = -1
+        self.flush_count = 0
+        self.flush_mask = 0
+        for suit in range(4):
+            if suit_counts[suit] >= 3:
+                self.flush_suit = suit
+                self.flush_count = suit_counts[suit]
+                self.flush_mask = suit_masks[suit]
+
 
 class PokerHandEvaluator:
-    """Evalúa y compara manos de poker"""
+    """Evalúa y compara manos de poker (evaluador de referencia)"""
+    
+    name = 'reference'
     
     # Rankings de manos (mayor número = mejor mano)
     HIGH_CARD = 1
@@ -54,18 +201,26 @@ class PokerHandEvaluator:
         return card[1]
     
     @staticmethod
-    def evaluate_hand(cards: List[str]) -> Tuple[int, List[int]]:
+    def straight_high(values) -> int:
+        """Retorna la carta más alta de la mejor escalera entre los valores dados (0 si no hay)"""
+        rank_mask = 0
+        for value in values:
+            rank_mask |= 1 << (value - 2)
+        return RANK_MASK_STRAIGHT_HIGH[rank_mask]
+    
+    @staticmethod
+    def evaluate_hand(cards: List[int]) -> Tuple[int, List[int]]:
         """
-        Evalúa una mano de 5-7 cartas y retorna (rank, kickers)
+        Evalúa una mano de 5-7 cartas (enteros 0-51) y retorna (rank, kickers)
         rank: tipo de mano (1-10)
         kickers: valores ordenados para desempate
         """
         if len(cards) < 5:
             return (0, [])
         
-        # Convertir cartas a valores y palos
-        values = [PokerHandEvaluator.get_card_value(c) for c in cards]
-        suits = [PokerHandEvaluator.get_card_suit(c) for c in cards]
+        # Convertir cartas a valores y palos (tablas precalculadas)
+        values = [CARD_VALUES[c] for c in cards]
+        suits = [CARD_SUITS[c] for c in cards]
         
         # Contar valores y palos
         value_counts = Counter(values)
@@ -76,45 +231,29 @@ class PokerHandEvaluator:
         values_desc = sorted(values, reverse=True)
         
         # Verificar flush
-        is_flush = max(suit_counts.values()) >= 5
         flush_suit = None
-        if is_flush:
-            for suit, count in suit_counts.items():
-                if count >= 5:
-                    flush_suit = suit
-                    break
-        
-        # Verificar straight
-        unique_values = sorted(set(values))
-        is_straight = False
-        straight_high = 0
-        
-        # Verificar straight normal
-        for i in range(len(unique_values) - 4):
-            if unique_values[i+4] - unique_values[i] == 4:
-                is_straight = True
-                straight_high = unique_values[i+4]
+        for suit, count in suit_counts.items():
+            if count >= 5:
+                flush_suit = suit
                 break
         
-        # Verificar straight con A-2-3-4-5 (wheel)
-        if 14 in unique_values and 2 in unique_values and 3 in unique_values and 4 in unique_values and 5 in unique_values:
-            is_straight = True
-            straight_high = 5
+        # Royal Flush o Straight Flush (la escalera debe ser del palo del color)
+        if flush_suit is not None:
+            flush_cards = [v for v, s in zip(values, suits) if s == flush_suit]
+            flush_cards.sort(reverse=True)
+            straight_flush_high = PokerHandEvaluator.straight_high(flush_cards)
+            if straight_flush_high == 14:
+                return (PokerHandEvaluator.ROYAL_FLUSH, [14])
+            elif straight_flush_high:
+                return (PokerHandEvaluator.STRAIGHT_FLUSH, [straight_flush_high])
         
         # Evaluar tipo de mano
         counts = sorted(value_counts.values(), reverse=True)
         
-        # Royal Flush o Straight Flush
-        if is_flush and is_straight:
-            if straight_high == 14:
-                return (PokerHandEvaluator.ROYAL_FLUSH, [14])
-            else:
-                return (PokerHandEvaluator.STRAIGHT_FLUSH, [straight_high])
-        
         # Four of a Kind
         if counts[0] == 4:
             four_kind = sorted_values[0][0]
-            kicker = sorted_values[1][0] if len(sorted_values) > 1 else 0
+            kicker = max((v for v in values if v != four_kind), default=0)
             return (PokerHandEvaluator.FOUR_OF_A_KIND, [four_kind, kicker])
         
         # Full House
@@ -124,13 +263,12 @@ class PokerHandEvaluator:
             return (PokerHandEvaluator.FULL_HOUSE, [three_kind, pair])
         
         # Flush
-        if is_flush:
-            flush_cards = [v for v, s in zip(values, suits) if s == flush_suit]
-            flush_cards.sort(reverse=True)
+        if flush_suit is not None:
             return (PokerHandEvaluator.FLUSH, flush_cards[:5])
         
         # Straight
-        if is_straight:
+        straight_high = PokerHandEvaluator.straight_high(values)
+        if straight_high:
             return (PokerHandEvaluator.STRAIGHT, [straight_high])
         
         # Three of a Kind
@@ -156,143 +294,3136 @@ class PokerHandEvaluator:
         return (PokerHandEvaluator.HIGH_CARD, values_desc[:5])
     
     @staticmethod
-    def compare_hands(hand1: Tuple[int, List[int]], hand2: Tuple[int, List[int]]) -> int:
-        """Compara dos manos. Retorna 1 si hand1 gana, -1 si hand2 gana, 0 si empate"""
-        rank1, kickers1 = hand1
-        rank2, kickers2 = hand2
-        
-        if rank1 > rank2:
-            return 1
-        elif rank1 < rank2:
-            return -1
-        else:
-            # Comparar kickers
-            for k1, k2 in zip(kickers1, kickers2):
-                if k1 > k2:
-                    return 1
-                elif k1 < k2:
-                    return -1
-            return 0
+    def compare_hands(hand1: Tuple[int, List[int]], hand2: Tuple[int, List[int]]) -> int:
+        """Compara dos manos. Retorna 1 si hand1 gana, -1 si hand2 gana, 0 si empate"""
+        rank1, kickers1 = hand1
+        rank2, kickers2 = hand2
+        
+        if rank1 > rank2:
+            return 1
+        elif rank1 < rank2:
+            return -1
+        else:
+            # Comparar kickers
+            for k1, k2 in zip(kickers1, kickers2):
+                if k1 > k2:
+                    return 1
+                elif k1 < k2:
+                    return -1
+            return 0
+    
+    # Fuerza de mano como un único entero totalmente ordenado:
+    # bits 20+ = tipo de mano (1-10), luego 5 kickers de 4 bits cada uno
+    CATEGORY_SHIFT = 20
+    
+    @staticmethod
+    def hand_strength(rank: int, kickers: List[int]) -> int:
+        """Convierte (rank, kickers) en un entero: mayor entero = mejor mano"""
+        strength = rank
+        for i in range(5):
+            strength = (strength << 4) | (kickers[i] if i < len(kickers) else 0)
+        return strength
+    
+    @staticmethod
+    def hand_category(strength: int) -> int:
+        """Recupera el tipo de mano (1-10) de una fuerza entera"""
+        return strength >> PokerHandEvaluator.CATEGORY_SHIFT
+    
+    @staticmethod
+    def evaluate_strength(cards: List[int]) -> int:
+        """Evalúa una mano de 5-7 cartas y retorna su fuerza como un único entero"""
+        rank, kickers = PokerHandEvaluator.evaluate_hand(cards)
+        return PokerHandEvaluator.hand_strength(rank, kickers)
+    
+    @staticmethod
+    def evaluate_many(hands: List[List[int]]) -> List[int]:
+        """Evalúa una lista de manos y retorna sus fuerzas"""
+        return [PokerHandEvaluator.evaluate_strength(hand) for hand in hands]
+    
+    @staticmethod
+    def board_state(board: List[int], track_suits: bool = True) -> BoardState:
+        """
+        Precalcula las cartas comunitarias una vez para evaluar muchas manos propias
+        track_suits=False: se sabe que no puede haber color (se ignoran los palos)
+        """
+        return BoardState(board, track_suits)
+    
+    @staticmethod
+    def board_flush_possible(board: BoardState) -> bool:
+        """Indica si alguna mano puede hacer color con esta mesa (3+ cartas de un palo)"""
+        return board.flush_suit >= 0
+    
+    @staticmethod
+    def evaluate_with_board(board: BoardState, card1: int, card2: int) -> int:
+        """
+        Evalúa 2 cartas propias sobre un estado de mesa precalculado
+        Retorna la misma fuerza que evaluate_strength(board.cards + [card1, card2])
+        """
+        if len(board.cards) < 3:
+            return 0
+        rank1 = card1 >> 2
+        rank2 = card2 >> 2
+        
+        # Color: con 7 cartas o menos, un color excluye poker y full house
+        flush_suit = board.flush_suit
+        if flush_suit >= 0:
+            flush_mask = board.flush_mask
+            flush_count = board.flush_count
+            if (card1 & 3) == flush_suit:
+                flush_mask |= 1 << rank1
+                flush_count += 1
+            if (card2 & 3) == flush_suit:
+                flush_mask |= 1 << rank2
+                flush_count += 1
+            if flush_count >= 5:
+                straight_flush_high = RANK_MASK_STRAIGHT_HIGH[flush_mask]
+                if straight_flush_high == 14:
+                    return (PokerHandEvaluator.ROYAL_FLUSH << 20) | (14 << 16)
+                elif straight_flush_high:
+                    return (PokerHandEvaluator.STRAIGHT_FLUSH << 20) | (straight_flush_high << 16)
+                return (PokerHandEvaluator.FLUSH << 20) | RANK_MASK_TOP_VALUES[flush_mask]
+        
+        return PokerHandEvaluator.evaluate_ranks_with_board(board, card1, card2)
+    
+    @staticmethod
+    def evaluate_ranks_with_board(board: BoardState, card1: int, card2: int) -> int:
+        """
+        Igual que evaluate_with_board pero solo con los rangos (sin mirar palos).
+        Válido cuando la mesa hace imposible el color para cualquier jugador
+        """
+        if len(board.cards) < 3:
+            return 0
+        rank1 = card1 >> 2
+        rank2 = card2 >> 2
+        
+        # Actualizar las máscaras de parejas/tríos/pókers solo con los rangos propios
+        rank_mask = board.rank_mask | (1 << rank1) | (1 << rank2)
+        pairs = board.pairs_mask
+        trips = board.trips_mask
+        quads = board.quads_mask
+        rank_counts = board.rank_counts
+        updates = ((rank1, 2),) if rank1 == rank2 else ((rank1, 1), (rank2, 1))
+        for rank, added in updates:
+            bit = 1 << rank
+            old_count = rank_counts[rank]
+            new_count = old_count + added
+            if old_count == 2:
+                pairs ^= bit
+            elif old_count == 3:
+                trips ^= bit
+            if new_count == 2:
+                pairs |= bit
+            elif new_count == 3:
+                trips |= bit
+            elif new_count == 4:
+                quads |= bit
+        
+        return PokerHandEvaluator._rank_strength(rank_mask, pairs, trips, quads)
+    
+    @staticmethod
+    def _rank_strength(rank_mask: int, pairs: int, trips: int, quads: int) -> int:
+        """
+        Fuerza de una mano sin color a partir de máscaras de rangos:
+        rangos presentes, rangos con 2, con 3 y con 4 cartas
+        """
+        if quads:
+            quad_bit = RANK_MASK_HIGH_BIT[quads]
+            kicker = RANK_MASK_HIGH_BIT[rank_mask & ~(1 << quad_bit)] + 2
+            return (PokerHandEvaluator.FOUR_OF_A_KIND << 20) | ((quad_bit + 2) << 16) | (kicker << 12)
+        if trips:
+            trips_bit = RANK_MASK_HIGH_BIT[trips]
+            full_pairs = (trips & ~(1 << trips_bit)) | pairs
+            if full_pairs:
+                pair = RANK_MASK_HIGH_BIT[full_pairs] + 2
+                return (PokerHandEvaluator.FULL_HOUSE << 20) | ((trips_bit + 2) << 16) | (pair << 12)
+        straight_high = RANK_MASK_STRAIGHT_HIGH[rank_mask]
+        if straight_high:
+            return (PokerHandEvaluator.STRAIGHT << 20) | (straight_high << 16)
+        if trips:
+            kickers = RANK_MASK_TOP_VALUES[rank_mask & ~(1 << trips_bit)] >> 12
+            return (PokerHandEvaluator.THREE_OF_A_KIND << 20) | ((trips_bit + 2) << 16) | (kickers << 8)
+        if pairs:
+            pair_bit = RANK_MASK_HIGH_BIT[pairs]
+            other_pairs = pairs & ~(1 << pair_bit)
+            if other_pairs:
+                second_bit = RANK_MASK_HIGH_BIT[other_pairs]
+                kicker = RANK_MASK_HIGH_BIT[rank_mask & ~(1 << pair_bit) & ~(1 << second_bit)] + 2
+                return ((PokerHandEvaluator.TWO_PAIR << 20) | ((pair_bit + 2) << 16)
+                        | ((second_bit + 2) << 12) | (kicker << 8))
+            kickers = RANK_MASK_TOP_VALUES[rank_mask & ~(1 << pair_bit)] >> 8
+            return (PokerHandEvaluator.PAIR << 20) | ((pair_bit + 2) << 16) | (kickers << 4)
+        return (PokerHandEvaluator.HIGH_CARD << 20) | RANK_MASK_TOP_VALUES[rank_mask]
+    
+    @staticmethod
+    def evaluate_bitboard(hand: int) -> int:
+        """
+        Evalúa una mano de 5-7 cartas dada como bitboard de 52 bits
+        Retorna la misma fuerza que evaluate_strength
+        """
+        spades = hand & SUIT_MASK
+        hearts = (hand >> 13) & SUIT_MASK
+        diamonds = (hand >> 26) & SUIT_MASK
+        clubs = hand >> 39
+        
+        # Color: popcount de cada palo
+        for suit_mask in (spades, hearts, diamonds, clubs):
+            if RANK_MASK_POPCOUNT[suit_mask] >= 5:
+                straight_flush_high = RANK_MASK_STRAIGHT_HIGH[suit_mask]
+                if straight_flush_high == 14:
+                    return (PokerHandEvaluator.ROYAL_FLUSH << 20) | (14 << 16)
+                elif straight_flush_high:
+                    return (PokerHandEvaluator.STRAIGHT_FLUSH << 20) | (straight_flush_high << 16)
+                return (PokerHandEvaluator.FLUSH << 20) | RANK_MASK_TOP_VALUES[suit_mask]
+        
+        # Contar cartas por rango sumando las 4 máscaras bit a bit (bits 1, 2 y 4 del conteo)
+        ones = spades ^ hearts
+        twos = spades & hearts
+        carry = ones & diamonds
+        ones ^= diamonds
+        twos ^= carry
+        carry = ones & clubs
+        ones ^= clubs
+        fours = twos & carry
+        twos ^= carry
+        
+        rank_mask = spades | hearts | diamonds | clubs
+        return PokerHandEvaluator._rank_strength(rank_mask, twos & ~ones, twos & ones, fours)
+    
+    # Tabla de bits más altos para evaluate_batch (se crea al primer uso)
+    _HIGHEST_BIT = None
+    
+    @staticmethod
+    def _highest_bit_table():
+        """Tabla (NumPy) con el índice del bit más alto de cada máscara de 14 bits (-1 para 0)"""
+        if PokerHandEvaluator._HIGHEST_BIT is None:
+            table = np.full(1 << 14, -1, dtype=np.int64)
+            for bit in range(14):
+                table[1 << bit:1 << (bit + 1)] = bit
+            PokerHandEvaluator._HIGHEST_BIT = table
+        return PokerHandEvaluator._HIGHEST_BIT
+    
+    @staticmethod
+    def evaluate_batch(hands) -> 'np.ndarray':
+        """
+        Evalúa un lote de manos en una sola llamada (requiere NumPy)
+        hands: array de enteros (N, 5-7) con cartas 0-51
+        Retorna: array (N,) con la fuerza de cada mano, idéntica a evaluate_strength
+        """
+        if np is None:
+            raise ImportError("La evaluación por lotes requiere NumPy (pip install numpy)")
+        hands = np.asarray(hands, dtype=np.int64)
+        if hands.ndim != 2 or not 5 <= hands.shape[1] <= 7:
+            raise ValueError("Se esperaba un array (N, 5-7) de cartas")
+        highest = PokerHandEvaluator._highest_bit_table()
+        
+        ranks = hands >> 2
+        suits = hands & 3
+        rank_bits = np.left_shift(1, ranks)
+        
+        # Histogramas de rangos y palos
+        rank_counts = (ranks[:, :, None] == np.arange(13)).sum(axis=1)
+        suit_counts = (suits[:, :, None] == np.arange(4)).sum(axis=1)
+        powers = np.left_shift(1, np.arange(13))
+        rank_mask = np.bitwise_or.reduce(rank_bits, axis=1)
+        quads_mask = ((rank_counts == 4) * powers).sum(axis=1)
+        trips_mask = ((rank_counts == 3) * powers).sum(axis=1)
+        pairs_mask = ((rank_counts == 2) * powers).sum(axis=1)
+        
+        # Color: máscara de rangos del palo con 5+ cartas
+        flush_suit = suit_counts.argmax(axis=1)
+        is_flush = suit_counts.max(axis=1) >= 5
+        flush_mask = np.bitwise_or.reduce(np.where(suits == flush_suit[:, None], rank_bits, 0), axis=1)
+        
+        def high_value(mask):
+            """Valor (2-14) de la carta más alta de la máscara, 0 si está vacía"""
+            bit = highest[mask]
+            return np.where(bit >= 0, bit + 2, 0)
+        
+        def without(mask, value):
+            """Quita de la máscara el rango con el valor dado (si lo hay)"""
+            return np.where(value > 0, mask & ~np.left_shift(1, np.maximum(value - 2, 0)), mask)
+        
+        def top_values(mask, count):
+            """Los valores de las `count` cartas más altas de la máscara"""
+            values = []
+            for _ in range(count):
+                value = high_value(mask)
+                values.append(value)
+                mask = without(mask, value)
+            return values
+        
+        def straight_high(mask):
+            """Carta alta de la mejor escalera (desplazar y AND, con el As también como 1)"""
+            extended = (mask << 1) | ((mask >> 12) & 1)
+            runs = extended & (extended >> 1) & (extended >> 2) & (extended >> 3) & (extended >> 4)
+            bit = highest[runs]
+            return np.where(bit >= 0, bit + 5, 0)
+        
+        def strength(category, kickers):
+            result = np.full(len(hands), category, dtype=np.int64)
+            for i in range(5):
+                result = (result << 4) | (kickers[i] if i < len(kickers) else 0)
+            return result
+        
+        # Fuerza de cada tipo de mano (se elige la de mayor prioridad que aplique)
+        flush_straight = straight_high(np.where(is_flush, flush_mask, 0))
+        straight = straight_high(rank_mask)
+        
+        quads = high_value(quads_mask)
+        trips = high_value(trips_mask)
+        full_pair = high_value(without(trips_mask, trips) | pairs_mask)
+        pair1 = high_value(pairs_mask)
+        pair2 = high_value(without(pairs_mask, pair1))
+        
+        conditions = [
+            flush_straight == 14,
+            flush_straight > 0,
+            quads > 0,
+            (trips > 0) & (full_pair > 0),
+            is_flush,
+            straight > 0,
+            trips > 0,
+            pair2 > 0,
+            pair1 > 0,
+        ]
+        choices = [
+            strength(PokerHandEvaluator.ROYAL_FLUSH, [flush_straight]),
+            strength(PokerHandEvaluator.STRAIGHT_FLUSH, [flush_straight]),
+            strength(PokerHandEvaluator.FOUR_OF_A_KIND, [quads, high_value(without(rank_mask, quads))]),
+            strength(PokerHandEvaluator.FULL_HOUSE, [trips, full_pair]),
+            strength(PokerHandEvaluator.FLUSH, top_values(flush_mask, 5)),
+            strength(PokerHandEvaluator.STRAIGHT, [straight]),
+            strength(PokerHandEvaluator.THREE_OF_A_KIND, [trips] + top_values(without(rank_mask, trips), 2)),
+            strength(PokerHandEvaluator.TWO_PAIR,
+                     [pair1, pair2, high_value(without(without(rank_mask, pair1), pair2))]),
+            strength(PokerHandEvaluator.PAIR, [pair1] + top_values(without(rank_mask, pair1), 3)),
+        ]
+        return np.select(conditions, choices,
+                         default=strength(PokerHandEvaluator.HIGH_CARD, top_values(rank_mask, 5)))
+
+
+class LookupTableEvaluator:
+    """
+    Evaluador basado en tablas precalculadas: ranking O(1) de manos de 7 cartas.
+    
+    Cada carta tiene una clave (clave_de_rango << 12 | clave_de_palo). Las claves de rango
+    garantizan que la suma de 7 cartas es única para cada combinación de rangos, así que la
+    suma indexa directamente la tabla de manos sin color. Si la suma de palos indica color,
+    se usa la máscara de 13 bits de ese palo en la tabla de colores.
+    
+    Las tablas se generan una sola vez, se guardan junto al script y se cargan con mmap,
+    por lo que varios procesos comparten las mismas páginas de memoria.
+    Los valores de las tablas son clases de mano (1 = peor), totalmente ordenadas.
+    """
+    
+    name = 'lookup'
+    TABLE_FILE = "hand_rank_table.dat"
+    MAGIC = b'PKRANK01'
+    HEADER = struct.Struct('<8sIII')  # magic, tamaño tabla sin color, tamaño tabla color, nº clases
+    
+    # Claves de rango (2..A) con suma única para cualquier combinación de 7 cartas
+    RANK_KEYS = [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181]
+    # Claves de palo en base 8: la suma codifica cuántas cartas hay de cada palo
+    SUIT_KEYS = [1, 8, 64, 512]
+    NONFLUSH_SIZE = 4 * RANK_KEYS[12] + 3 * RANK_KEYS[11] + 1
+    FLUSH_SIZE = 1 << 13
+    
+    CARD_KEYS = [(rank_key << 12) | suit_key for rank_key, suit_key in zip(sorted(RANK_KEYS * 4), SUIT_KEYS * 13)]
+    CARD_RANK_BITS = [1 << (card // 4) for card in range(52)]
+    # Palo con 5+ cartas según la suma de claves de palo (-1 si no hay color)
+    FLUSH_SUIT = [next((s for s in range(4) if ((key >> (3 * s)) & 7) >= 5), -1) for key in range(4096)]
+    # Mesas con 3+ cartas de algún palo (las únicas en las que alguien puede hacer color)
+    FLUSH_DRAW = [any(((key >> (3 * s)) & 7) >= 3 for s in range(4)) for key in range(4096)]
+    
+    def __init__(self, table_path: Optional[str] = None):
+        if table_path is None:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            table_path = os.path.join(script_dir, self.TABLE_FILE)
+        self.table_path = table_path
+        self._mmap = None
+        self.nonflush_table = None
+        self.flush_table = None
+        self.classes = []  # clase -> (rank, kickers)
+        self.strengths = []  # clase -> fuerza entera (ver PokerHandEvaluator.hand_strength)
+        self.class_index = {}  # (rank, tuple(kickers)) -> clase
+        self.load()
+    
+    @staticmethod
+    def _nonflush_cards(ranks: List[int]) -> List[int]:
+        """Construye cartas con los rangos dados repartiendo palos para que no haya color"""
+        return [rank * 4 + i % 4 for i, rank in enumerate(sorted(ranks))]
+    
+    @classmethod
+    def generate_table(cls, table_path: str) -> bytes:
+        """Genera las tablas con el evaluador de referencia y las guarda en disco"""
+        print(f"Generando tabla de rankings de manos: {table_path}")
+        nonflush_hands = {}
+        for ranks in itertools.combinations_with_replacement(range(13), 7):
+            if max(Counter(ranks).values()) > 4:
+                continue
+            key = sum(cls.RANK_KEYS[r] for r in ranks)
+            nonflush_hands[key] = PokerHandEvaluator.evaluate_hand(cls._nonflush_cards(ranks))
+        
+        # Con 5+ cartas de un palo en 7 cartas no puede haber poker ni full house,
+        # así que basta con la mejor mano formada por las cartas del palo del color
+        flush_hands = {}
+        for mask in range(cls.FLUSH_SIZE):
+            if 5 <= bin(mask).count('1') <= 7:
+                flush_hands[mask] = PokerHandEvaluator.evaluate_hand(
+                    [r * 4 for r in range(13) if mask & (1 << r)])
+        
+        # Clases de mano ordenadas de peor a mejor (0 = entrada vacía). Se incluyen todas
+        # las manos de 5 cartas para poder clasificar también manos de 5 y 6 cartas
+        five_card_hands = [PokerHandEvaluator.evaluate_hand(cls._nonflush_cards(ranks))
+                           for ranks in itertools.combinations_with_replacement(range(13), 5)
+                           if max(Counter(ranks).values()) <= 4]
+        all_hands = sorted({(rank, tuple(kickers)) for rank, kickers in
+                            five_card_hands + list(nonflush_hands.values()) + list(flush_hands.values())})
+        class_of = {hand: i + 1 for i, hand in enumerate(all_hands)}
+        
+        nonflush = array('H', bytes(2 * cls.NONFLUSH_SIZE))
+        for key, (rank, kickers) in nonflush_hands.items():
+            nonflush[key] = class_of[(rank, tuple(kickers))]
+        flush = array('H', bytes(2 * cls.FLUSH_SIZE))
+        for mask, (rank, kickers) in flush_hands.items():
+            flush[mask] = class_of[(rank, tuple(kickers))]
+        if sys.byteorder != 'little':
+            nonflush.byteswap()
+            flush.byteswap()
+        # Cada clase se guarda como 6 bytes: rank + 5 kickers (rellenados con 0)
+        classes = bytes(b for rank, kickers in all_hands
+                        for b in [rank] + list(kickers) + [0] * (5 - len(kickers)))
+        
+        data = (cls.HEADER.pack(cls.MAGIC, cls.NONFLUSH_SIZE, cls.FLUSH_SIZE, len(all_hands))
+                + nonflush.tobytes() + flush.tobytes() + classes)
+        try:
+            # Escribir en un archivo temporal y renombrar (seguro con varios procesos)
+            tmp_path = f"{table_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, table_path)
+        except OSError as e:
+            print(f"No se pudo guardar la tabla de rankings: {table_path} - {e}")
+        return data
+    
+    def load(self):
+        """Carga las tablas con mmap (generándolas si no existen o están desactualizadas)"""
+        buffer = None
+        if os.path.exists(self.table_path):
+            try:
+                with open(self.table_path, 'rb') as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, nonflush_size, flush_size, _ = self.HEADER.unpack_from(self._mmap)
+                if (magic == self.MAGIC and nonflush_size == self.NONFLUSH_SIZE
+                        and flush_size == self.FLUSH_SIZE):
+                    buffer = self._mmap
+                else:
+                    print(f"Tabla de rankings desactualizada: {self.table_path}")
+                    self._mmap.close()
+                    self._mmap = None
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Error al cargar la tabla de rankings: {self.table_path} - {e}")
+                self._mmap = None
+        if buffer is None:
+            buffer = self.generate_table(self.table_path)
+        
+        _, nonflush_size, flush_size, num_classes = self.HEADER.unpack_from(buffer)
+        view = memoryview(buffer)
+        offset = self.HEADER.size
+        if sys.byteorder == 'little':
+            self.nonflush_table = view[offset:offset + 2 * nonflush_size].cast('H')
+        else:
+            self.nonflush_table = array('H')
+            self.nonflush_table.frombytes(view[offset:offset + 2 * nonflush_size])
+            self.nonflush_table.byteswap()
+        offset += 2 * nonflush_size
+        # La tabla de colores es pequeña: se copia a una lista normal
+        flush = array('H')
+        flush.frombytes(view[offset:offset + 2 * flush_size])
+        if sys.byteorder != 'little':
+            flush.byteswap()
+        self.flush_table = flush.tolist()
+        offset += 2 * flush_size
+        
+        self.classes = [(0, [])]
+        for i in range(num_classes):
+            record = view[offset + 6 * i:offset + 6 * i + 6]
+            rank = record[0]
+            kickers = [k for k in record[1:] if k]
+            self.classes.append((rank, kickers))
+            self.class_index[(rank, tuple(kickers))] = i + 1
+        self.strengths = [PokerHandEvaluator.hand_strength(rank, kickers) for rank, kickers in self.classes]
+    
+    def rank_hand(self, cards: List[int]) -> int:
+        """Retorna la clase de la mano (mayor = mejor). O(1) para 7 cartas"""
+        if len(cards) != 7:
+            # La tabla cubre 7 cartas; otros tamaños usan el evaluador de referencia
+            rank, kickers = PokerHandEvaluator.evaluate_hand(cards)
+            return self.class_index[(rank, tuple(kickers))]
+        key = sum(map(self.CARD_KEYS.__getitem__, cards))
+        suit = self.FLUSH_SUIT[key & 0xFFF]
+        if suit < 0:
+            return self.nonflush_table[key >> 12]
+        mask = 0
+        for card in cards:
+            if (card & 3) == suit:
+                mask |= self.CARD_RANK_BITS[card]
+        return self.flush_table[mask]
+    
+    def evaluate_hand(self, cards: List[int]) -> Tuple[int, List[int]]:
+        """Igual que PokerHandEvaluator.evaluate_hand (el resultado es compartido: no modificar)"""
+        if len(cards) < 5:
+            return (0, [])
+        if len(cards) != 7:
+            return PokerHandEvaluator.evaluate_hand(cards)
+        return self.classes[self.rank_hand(cards)]
+    
+    def evaluate_strength(self, cards: List[int]) -> int:
+        """Igual que PokerHandEvaluator.evaluate_strength, sin crear listas para 7 cartas"""
+        if len(cards) != 7:
+            return PokerHandEvaluator.evaluate_strength(cards)
+        return self.strengths[self.rank_hand(cards)]
+    
+    def evaluate_many(self, hands: List[List[int]]) -> List[int]:
+        """Evalúa una lista de manos y retorna sus fuerzas"""
+        return [self.evaluate_strength(hand) for hand in hands]
+    
+    def board_state(self, board: List[int], track_suits: bool = True):
+        """
+        Precalcula la suma de claves de las cartas comunitarias y, si hay 3+ cartas
+        de algún palo, las máscaras por palo (sin ellas no hay color posible)
+        """
+        board_key = sum(map(self.CARD_KEYS.__getitem__, board))
+        suit_masks = None
+        if track_suits and self.FLUSH_DRAW[board_key & 0xFFF]:
+            suit_masks = [0, 0, 0, 0]
+            for card in board:
+                suit_masks[card & 3] |= self.CARD_RANK_BITS[card]
+        return (board_key, suit_masks, board)
+    
+    @staticmethod
+    def board_flush_possible(board) -> bool:
+        """Indica si alguna mano puede hacer color con esta mesa (3+ cartas de un palo)"""
+        return board[1] is not None
+    
+    def evaluate_with_board(self, board, card1: int, card2: int) -> int:
+        """Evalúa 2 cartas propias sobre board_state(board): dos sumas y una consulta a la tabla"""
+        board_key, suit_masks, board_cards = board
+        if len(board_cards) != 5:
+            return self.evaluate_strength(board_cards + [card1, card2])
+        key = board_key + self.CARD_KEYS[card1] + self.CARD_KEYS[card2]
+        suit = self.FLUSH_SUIT[key & 0xFFF] if suit_masks is not None else -1
+        if suit < 0:
+            return self.strengths[self.nonflush_table[key >> 12]]
+        mask = suit_masks[suit]
+        if (card1 & 3) == suit:
+            mask |= self.CARD_RANK_BITS[card1]
+        if (card2 & 3) == suit:
+            mask |= self.CARD_RANK_BITS[card2]
+        return self.strengths[self.flush_table[mask]]
+    
+    def evaluate_ranks_with_board(self, board, card1: int, card2: int) -> int:
+        """Como evaluate_with_board, sin comprobar el color (mesa sin color posible)"""
+        board_key, _, board_cards = board
+        if len(board_cards) != 5:
+            return self.evaluate_strength(board_cards + [card1, card2])
+        return self.strengths[self.nonflush_table[(board_key + self.CARD_KEYS[card1] + self.CARD_KEYS[card2]) >> 12]]
+    
+    compare_hands = staticmethod(PokerHandEvaluator.compare_hands)
+
+
+_lookup_evaluator = None
+
+
+def get_lookup_evaluator() -> LookupTableEvaluator:
+    """Retorna el evaluador por tablas del proceso (se carga una sola vez)"""
+    global _lookup_evaluator
+    if _lookup_evaluator is None:
+        _lookup_evaluator = LookupTableEvaluator()
+    return _lookup_evaluator
+
+
+class NumpyBatchEvaluator(PokerHandEvaluator):
+    """
+    Evaluador por lotes con NumPy (PokerHandEvaluator.evaluate_batch).
+    Las evaluaciones de una sola mano usan el evaluador de referencia.
+    """
+    
+    name = 'numpy'
+    
+    def __init__(self):
+        if np is None:
+            raise ImportError("El evaluador 'numpy' requiere NumPy (pip install numpy)")
+    
+    @staticmethod
+    def evaluate_many(hands: List[List[int]]) -> List[int]:
+        """Evalúa muchas manos agrupándolas por número de cartas en arrays de NumPy"""
+        strengths = [0] * len(hands)
+        by_size = {}
+        for i, hand in enumerate(hands):
+            by_size.setdefault(len(hand), []).append(i)
+        for size, indices in by_size.items():
+            if size < 5:
+                continue
+            batch = PokerHandEvaluator.evaluate_batch([hands[i] for i in indices])
+            for i, strength in zip(indices, batch.tolist()):
+                strengths[i] = strength
+        return strengths
+
+
+class BitboardEvaluator(PokerHandEvaluator):
+    """
+    Evaluador sobre bitboards de 52 bits (PokerHandEvaluator.evaluate_bitboard).
+    La mesa se precalcula como un bitboard y cada mano propia añade sus 2 bits
+    """
+    
+    name = 'bitboard'
+    
+    @staticmethod
+    def evaluate_strength(cards: List[int]) -> int:
+        """Igual que PokerHandEvaluator.evaluate_strength, evaluando el bitboard de la mano"""
+        if len(cards) < 5:
+            return 0
+        return PokerHandEvaluator.evaluate_bitboard(cards_to_bitboard(cards))
+    
+    @staticmethod
+    def evaluate_many(hands: List[List[int]]) -> List[int]:
+        """Evalúa una lista de manos y retorna sus fuerzas"""
+        return [BitboardEvaluator.evaluate_strength(hand) for hand in hands]
+    
+    @staticmethod
+    def board_state(board: List[int], track_suits: bool = True):
+        """Precalcula el bitboard de la mesa y si alguna mano puede hacer color con ella"""
+        mask = cards_to_bitboard(board)
+        flush_possible = track_suits and any(RANK_MASK_POPCOUNT[(mask >> (13 * suit)) & SUIT_MASK] >= 3
+                                             for suit in range(4))
+        return (mask, len(board), flush_possible)
+    
+    @staticmethod
+    def board_flush_possible(board) -> bool:
+        """Indica si alguna mano puede hacer color con esta mesa (3+ cartas de un palo)"""
+        return board[2]
+    
+    @staticmethod
+    def evaluate_with_board(board, card1: int, card2: int) -> int:
+        """Evalúa 2 cartas propias añadiendo sus bits al bitboard de la mesa"""
+        mask, num_cards, _ = board
+        if num_cards < 3:
+            return 0
+        return PokerHandEvaluator.evaluate_bitboard(mask | CARD_BITS[card1] | CARD_BITS[card2])
+    
+    # El color solo se detecta si la mano lo tiene: sin color posible el resultado es el mismo
+    evaluate_ranks_with_board = evaluate_with_board
+
+
+# Evaluadores disponibles: todos retornan la misma fuerza entera para cada mano
+EVALUATOR_BACKENDS = {
+    'reference': lambda: PokerHandEvaluator,
+    'lookup': get_lookup_evaluator,
+    'numpy': NumpyBatchEvaluator,
+    'bitboard': BitboardEvaluator,
+}
+# Variable de entorno para elegir el evaluador sin tocar el código
+EVALUATOR_ENV_VAR = 'POKER_EVALUATOR'
+DEFAULT_EVALUATOR = 'reference'
+
+
+def get_evaluator(name: Optional[str] = None):
+    """
+    Retorna el evaluador con el nombre dado ('reference', 'lookup', 'numpy', 'bitboard').
+    Sin nombre, usa la variable de entorno POKER_EVALUATOR o el evaluador por defecto.
+    """
+    if name is None:
+        name = os.environ.get(EVALUATOR_ENV_VAR) or DEFAULT_EVALUATOR
+    name = name.strip().lower()
+    if name not in EVALUATOR_BACKENDS:
+        raise ValueError(f"Evaluador desconocido: '{name}'. Opciones: {', '.join(EVALUATOR_BACKENDS)}")
+    return EVALUATOR_BACKENDS[name]()
+
+
+def random_hands(count: int, sizes=(5, 6, 7), seed: Optional[int] = None) -> List[List[int]]:
+    """Genera manos aleatorias (sin cartas repetidas) con los tamaños dados"""
+    rng = random.Random(seed)
+    return [rng.sample(range(52), rng.choice(sizes)) for _ in range(count)]
+
+
+def verify_evaluators(evaluator_a, evaluator_b, hands, chunk_size: int = 20000,
+                      max_reports: int = 10) -> dict:
+    """
+    Comprobación diferencial: pasa las mismas manos por dos evaluadores y verifica
+    que ordenan todas las manos igual (mismos empates y mismo orden entre fuerzas).
+    También comprueba la ruta incremental (board_state + evaluate_with_board) de cada uno.
+    hands: cualquier iterable de manos (por ejemplo random_hands o itertools.combinations)
+    Retorna: {'evaluators', 'hands', 'mismatches' (número), 'examples' (descripciones), 'ok'}
+    """
+    if isinstance(evaluator_a, str):
+        evaluator_a = get_evaluator(evaluator_a)
+    if isinstance(evaluator_b, str):
+        evaluator_b = get_evaluator(evaluator_b)
+    
+    mismatches = []
+    
+    def report(message):
+        if len(mismatches) < max_reports:
+            mismatches.append(message)
+    
+    def hand_text(hand):
+        return ' '.join(card_to_str(card) for card in hand)
+    
+    # Fuerza de A -> (fuerza de B, mano de ejemplo). Un orden coherente exige que
+    # cada fuerza de A tenga una sola fuerza de B y que ambas crezcan juntas
+    strength_map = {}
+    total = 0
+    mismatch_count = 0
+    hands = iter(hands)
+    while True:
+        chunk = [list(hand) for hand in itertools.islice(hands, chunk_size)]
+        if not chunk:
+            break
+        total += len(chunk)
+        strengths_a = evaluator_a.evaluate_many(chunk)
+        strengths_b = evaluator_b.evaluate_many(chunk)
+        for hand, strength_a, strength_b in zip(chunk, strengths_a, strengths_b):
+            known = strength_map.get(strength_a)
+            if known is None:
+                strength_map[strength_a] = (strength_b, hand)
+            elif known[0] != strength_b:
+                mismatch_count += 1
+                report(f"Empate en {evaluator_a.name} pero no en {evaluator_b.name}: "
+                       f"[{hand_text(known[1])}] vs [{hand_text(hand)}]")
+        
+        # Ruta incremental: mesa de 5 cartas precalculada + 2 cartas propias
+        for evaluator, strengths in ((evaluator_a, strengths_a), (evaluator_b, strengths_b)):
+            for hand, strength in zip(chunk, strengths):
+                if len(hand) == 7:
+                    board = evaluator.board_state(hand[:5])
+                    if evaluator.evaluate_with_board(board, hand[5], hand[6]) != strength:
+                        mismatch_count += 1
+                        report(f"{evaluator.name}: evaluate_with_board difiere en [{hand_text(hand)}]")
+    
+    previous = None
+    for strength_a in sorted(strength_map):
+        strength_b, hand = strength_map[strength_a]
+        if previous is not None and strength_b <= previous[0]:
+            mismatch_count += 1
+            report(f"Orden distinto: {evaluator_a.name} pone [{hand_text(hand)}] por encima de "
+                   f"[{hand_text(previous[1])}] y {evaluator_b.name} no")
+        previous = (strength_b, hand)
+    
+    return {
+        'evaluators': (evaluator_a.name, evaluator_b.name),
+        'hands': total,
+        'mismatches': mismatch_count,
+        'examples': mismatches,
+        'ok': mismatch_count == 0,
+    }
+
+
+# Enumeración exacta: máximo de repartos (mesas × manos rivales) para recorrerlos todos en
+# lugar de simular. Por debajo se elige lo más rápido según estimate_exact_seconds y
+# ProbabilityCalculator.simulation_seconds (river y turn heads-up suelen salir exactos)
+EXACT_ENUMERATION_LIMIT = 1200000
+# Velocidad de la enumeración exacta en un proceso: manos de 2 cartas evaluadas por
+# segundo y conjuntos de manos rivales contados por segundo (ver _enumerate_exact)
+EXACT_HANDS_PER_SECOND = 600000
+EXACT_HAND_SETS_PER_SECOND = 10000000
+# Con menos repartos no compensa repartir el trabajo entre procesos
+EXACT_PARALLEL_MIN_DEALS = 50000
+
+
+# Monte Carlo adaptativo: tamaño de cada lote y máximo de simulaciones por defecto
+SIMULATION_BATCH_SIZE = 2000
+ADAPTIVE_MAX_SIMULATIONS = 500000
+# Con límite de tiempo: simulaciones del primer lote (mide la velocidad)
+DEADLINE_PROBE_SIMULATIONS = 200
+# Con límite de tiempo: coste fijo estimado de cada lote enviado al pool (envío de las
+# tareas y recogida de resultados) hasta medir la velocidad real del pool
+POOL_BATCH_SECONDS = 0.01
+# Velocidad de la simulación en un proceso hasta medirla: cada simulación cuesta como
+# evaluar num_players + SIMULATION_OVERHEAD_HANDS manos (barajar y preparar la mesa)
+SIMULATION_HANDS_PER_SECOND = 450000
+SIMULATION_OVERHEAD_HANDS = 3
+# Con límite de tiempo, un resultado de la caché vale si tiene al menos esta fracción de
+# las simulaciones que cabrían en el tiempo (el cálculo nunca llega a aprovecharlo entero)
+DEADLINE_CACHE_FRACTION = 0.9
+# Por debajo de estas simulaciones no compensa repartirlas entre procesos
+PARALLEL_MIN_SIMULATIONS = 5000
+# Intentos para repartir manos compatibles a los oponentes con rango antes de desistir
+MAX_RANGE_ATTEMPTS = 1000
+# Cada cuántas simulaciones (o manos enumeradas) se comprueba si el cálculo se canceló,
+# y cada cuántos segundos mientras se espera a los procesos del pool
+CANCEL_CHECK_INTERVAL = 256
+CANCEL_POLL_SECONDS = 0.005
+# Métodos de muestreo de la simulación y puntos por bloque: cada bloque es una estimación
+# independiente, y el error estándar sale de la varianza entre bloques (ver iter_simulation)
+SAMPLING_BLOCK_SIZES = {'random': 1, 'stratified': 128, 'qmc': 256}
+# Bloques necesarios para estimar el error con la varianza entre bloques
+MIN_ERROR_BLOCKS = 10
+# El mayor float menor que 1 (las coordenadas de los puntos deben quedar en [0, 1))
+LARGEST_UNIT_FLOAT = 1.0 - 2.0 ** -53
+# Muestreo por importancia de las manos que me ganan (ver estimate_losing_hands): peso extra
+# de una carta (peso base 1) por cada carta de la mesa de su mismo rango (poker, full), de su
+# mismo palo (color) y de su mismo palo a 4 rangos o menos (escalera de color)
+IMPORTANCE_RANK_BOOST = 3.0
+IMPORTANCE_SUIT_BOOST = 0.5
+IMPORTANCE_STRAIGHT_FLUSH_BOOST = 2.0
+# Fracción de repartos uniformes en la mezcla defensiva: acota cada peso a 1 / fracción
+IMPORTANCE_UNIFORM_FRACTION = 0.5
+
+
+class CalculationCancelled(Exception):
+    """El cálculo se canceló con su CancellationToken antes de terminar"""
+
+
+class PoolCancelFlag:
+    """
+    Señal de cancelación para las tareas del pool de procesos: un Event de un Manager de
+    multiprocessing (ver CancellationToken.pool_flag). Las tareas la usan como un
+    CancellationToken, pero la consultan como mucho cada CANCEL_POLL_SECONDS porque cada
+    consulta es una llamada al proceso del Manager
+    """
+    
+    def __init__(self, event):
+        self.event = event
+        self.next_check = 0.0
+    
+    @property
+    def cancelled(self) -> bool:
+        now = time.perf_counter()
+        if now < self.next_check:
+            return False
+        self.next_check = now + CANCEL_POLL_SECONDS
+        try:
+            return self.event.is_set()
+        except (OSError, EOFError):
+            # El Manager ya no existe (el programa principal terminó)
+            return True
+    
+    def raise_if_cancelled(self) -> None:
+        """Lanza CalculationCancelled si se pidió cancelar"""
+        if self.cancelled:
+            raise CalculationCancelled()
+
+
+class CancellationToken:
+    """
+    Señal para cancelar un cálculo en curso desde otro thread. El calculador la comprueba
+    cada CANCEL_CHECK_INTERVAL simulaciones y lanza CalculationCancelled; las tareas ya
+    enviadas al pool de procesos la reciben como PoolCancelFlag (ver pool_flag)
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._pool_flag = None
+    
+    def cancel(self) -> None:
+        """Pide que el cálculo termine cuanto antes (también a sus tareas del pool)"""
+        self._event.set()
+        with self._lock:
+            pool_flag = self._pool_flag
+        if pool_flag is not None:
+            try:
+                pool_flag.event.set()
+            except (OSError, EOFError):
+                pass
+    
+    def pool_flag(self) -> Optional[PoolCancelFlag]:
+        """
+        Señal que se envía con las tareas del pool, creada la primera vez que hace falta.
+        None si no se pudo arrancar el Manager (las tareas en curso no se podrán parar)
+        """
+        with self._lock:
+            if self._pool_flag is None:
+                manager = get_cancel_manager()
+                if manager is None:
+                    return None
+                self._pool_flag = PoolCancelFlag(manager.Event())
+                if self._event.is_set():
+                    self._pool_flag.event.set()
+            return self._pool_flag
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self) -> None:
+        """Lanza CalculationCancelled si se pidió cancelar"""
+        if self._event.is_set():
+            raise CalculationCancelled()
+
+
+class EquityResult(NamedTuple):
+    """Resultado de un cálculo de equity"""
+    probability: float  # Probabilidad de ganar (los empates cuentan como victoria)
+    top_losing_hands: List[Tuple[str, int]]  # (mano que me gana, número de repartos)
+    samples: int  # Repartos simulados o enumerados
+    std_error: float  # Error estándar de la probabilidad (0 si es exacta)
+    exact: bool  # True si se enumeraron todos los repartos
+    
+    def half_width(self, confidence: float = 0.95) -> float:
+        """Semianchura del intervalo de confianza de la probabilidad"""
+        return normal_quantile(confidence) * self.std_error
+
+
+class LosingHandsResult(NamedTuple):
+    """Frecuencia de cada tipo de mano que me gana (ver ProbabilityCalculator.estimate_losing_hands)"""
+    frequencies: List[Tuple[str, float, float]]  # (mano que me gana, probabilidad, error estándar)
+    probability: float  # Probabilidad de ganar (los empates cuentan como victoria)
+    samples: int  # Repartos simulados
+    effective_samples: float  # Tamaño efectivo de la muestra con los pesos (= samples sin importancia)
+
+
+class SeatEquity(NamedTuple):
+    """Resultado de un jugador en ProbabilityCalculator.calculate_showdown"""
+    cards: Tuple[int, ...]  # Cartas del jugador (vacío si su mano es aleatoria)
+    win: float  # Probabilidad de ganar el bote entero
+    tie: float  # Probabilidad de repartir el bote con otros
+    equity: float  # Parte media del bote: victorias + empates divididos entre los empatados
+    std_error: float  # Error estándar de equity (0 si es exacta)
+
+
+class ShowdownResult(NamedTuple):
+    """Reparto del bote entre todos los jugadores (ver calculate_showdown)"""
+    seats: List[SeatEquity]  # Un resultado por jugador, en el orden de las manos recibidas
+    samples: int  # Mesas enumeradas o repartos simulados
+    exact: bool  # True si se enumeraron todas las mesas
+
+
+def normal_quantile(confidence: float) -> float:
+    """Valor z del intervalo de confianza bilateral (1.96 para el 95%)"""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def binomial_std_error(wins: int, samples: int) -> float:
+    """
+    Error estándar de wins / samples. Usa (wins + 1) / (samples + 2) para que con
+    probabilidades cercanas a 0 o 1 el error no sea 0 tras pocas simulaciones
+    """
+    if samples <= 0:
+        return 0.0
+    p = (wins + 1) / (samples + 2)
+    return math.sqrt(p * (1 - p) / samples)
+
+
+def block_std_error(wins: int, samples: int, block_sq_sum: int, block_size: int) -> float:
+    """
+    Error estándar de wins / samples cuando las muestras vienen en bloques independientes
+    de block_size (estratificados o cuasi-aleatorios): varianza de la media de cada bloque
+    entre el número de bloques. block_sq_sum es la suma de (victorias del bloque)²
+    """
+    blocks = samples // block_size
+    if blocks < 2:
+        return binomial_std_error(wins, samples)
+    mean = wins / samples
+    mean_sq = block_sq_sum / (block_size * block_size * blocks)
+    variance = max(mean_sq - mean * mean, 0.0) * blocks / (blocks - 1)
+    return math.sqrt(variance / blocks)
+
+
+def radical_inverse(index: int, base: int) -> float:
+    """Refleja los dígitos de index en base `base` tras la coma (base 2: 1 -> 0.5, 2 -> 0.25, 3 -> 0.75)"""
+    result = 0.0
+    scale = 1.0
+    while index:
+        scale /= base
+        result += scale * (index % base)
+        index //= base
+    return result
+
+
+def first_primes(count: int) -> List[int]:
+    """Los count primeros números primos"""
+    primes = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % prime for prime in primes):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+_HALTON_POINTS = {}
+
+
+def halton_points(count: int, dimensions: int) -> List[List[float]]:
+    """
+    Los count primeros puntos de la sucesión de Halton en [0, 1)^dimensions (una base
+    prima por coordenada). Se calculan una vez y se reutilizan
+    """
+    key = (count, dimensions)
+    points = _HALTON_POINTS.get(key)
+    if points is None:
+        bases = first_primes(dimensions)
+        points = [[radical_inverse(index, base) for base in bases] for index in range(1, count + 1)]
+        _HALTON_POINTS[key] = points
+    return points
+
+
+def count_exact_deals(num_available: int, needed_community: int, num_opponents: int) -> int:
+    """
+    Número de repartos distintos: cartas comunitarias por salir × conjuntos de manos
+    rivales (sin orden entre rivales, ya que solo importa la mejor de ellas)
+    """
+    rest = num_available - needed_community
+    if rest < 2 * num_opponents:
+        return 0
+    # Emparejamientos de 2k cartas en k manos: (2k)! / (2^k k!)
+    pairings = math.factorial(2 * num_opponents) // (2 ** num_opponents * math.factorial(num_opponents))
+    return math.comb(num_available, needed_community) * math.comb(rest, 2 * num_opponents) * pairings
+
+
+def estimate_exact_seconds(num_available: int, needed_community: int, num_opponents: int,
+                           workers: int = 1) -> float:
+    """
+    Tiempo estimado de la enumeración exacta: en cada mesa se evalúan todas las manos de
+    2 cartas y se cuentan los conjuntos de rivales de cada mejor mano (ver _enumerate_exact)
+    """
+    runouts = math.comb(num_available, needed_community)
+    hands = math.comb(num_available - needed_community, 2)
+    hand_sets = math.comb(hands, num_opponents)
+    seconds = runouts * (hands / EXACT_HANDS_PER_SECOND + hand_sets / EXACT_HAND_SETS_PER_SECOND)
+    return seconds / workers
+
+
+def _count_disjoint_hand_sets(masks: List[int], start: int, k: int, used: int) -> int:
+    """Cuenta los conjuntos de k manos (de masks[start:]) sin cartas en común ni con used"""
+    if k == 0:
+        return 1
+    if k == 1:
+        return sum(1 for j in range(start, len(masks)) if not masks[j] & used)
+    total = 0
+    for j in range(start, len(masks)):
+        if not masks[j] & used:
+            total += _count_disjoint_hand_sets(masks, j + 1, k - 1, used | masks[j])
+    return total
+
+
+def _enumerate_exact(evaluator, my_cards: List[int], community_cards: List[int], runouts,
+                     num_opponents: int, offset: int = 0, step: int = 1,
+                     cancel_token=None) -> Tuple[int, int, Counter]:
+    """
+    Recorre todas las mesas de runouts y todos los conjuntos de manos rivales.
+    Para cada mesa se evalúan una sola vez las manos posibles de 2 cartas; ordenadas de
+    mayor a menor, cada conjunto de rivales se cuenta en su mejor mano (la primera).
+    offset/step permiten repartir esas mejores manos entre varios procesos.
+    Retorna: (repartos ganados o empatados, repartos totales, Counter(tipo -> repartos perdidos))
+    """
+    board_state = evaluator.board_state
+    board_flush_possible = evaluator.board_flush_possible
+    evaluate_with_board = evaluator.evaluate_with_board
+    evaluate_ranks_with_board = evaluator.evaluate_ranks_with_board
+    category_shift = PokerHandEvaluator.CATEGORY_SHIFT
+    
+    flush_possible = ProbabilityCalculator.flush_possible(community_cards)
+    available = bitboard_to_cards(FULL_DECK_MASK & ~cards_to_bitboard(my_cards + community_cards))
+    wins = 0
+    total = 0
+    losing = Counter()
+    checks = 0  # Iteraciones recorridas, para comprobar la cancelación aunque step > 1
+    
+    for runout in runouts:
+        board = board_state(community_cards + list(runout), flush_possible)
+        if flush_possible and board_flush_possible(board):
+            evaluate = evaluate_with_board
+        else:
+            evaluate = evaluate_ranks_with_board
+        my_strength = evaluate(board, my_cards[0], my_cards[1])
+        
+        runout_mask = cards_to_bitboard(runout)
+        deck = [card for card in available if not CARD_BITS[card] & runout_mask]
+        hands = [(evaluate(board, a, b), CARD_BITS[a] | CARD_BITS[b])
+                 for a, b in itertools.combinations(deck, 2)]
+        if num_opponents > 1:
+            hands.sort(reverse=True)
+        masks = [mask for _, mask in hands]
+        
+        for i in range(offset, len(hands), step):
+            checks += 1
+            if cancel_token is not None and not checks % CANCEL_CHECK_INTERVAL:
+                cancel_token.raise_if_cancelled()
+            strength, mask = hands[i]
+            count = _count_disjoint_hand_sets(masks, i + 1, num_opponents - 1, mask)
+            if not count:
+                continue
+            total += count
+            if strength > my_strength:
+                losing[strength >> category_shift] += count
+            else:
+                wins += count
+    
+    return wins, total, losing
+
+
+def _enumerate_exact_board_group(evaluator, community_cards: List[int], scenarios,
+                                 cancel_token=None) -> List[Tuple[int, int, Counter]]:
+    """
+    Enumeración exacta de varios escenarios (mis cartas, número de oponentes) con la misma
+    mesa: cada mesa completa se prepara una sola vez y se evalúan una sola vez todas las
+    manos de 2 cartas que no están en ella; cada escenario descarta después las mesas y las
+    manos que usan sus cartas. Da lo mismo que _enumerate_exact para cada escenario
+    Retorna, en el orden de scenarios: (repartos ganados o empatados, repartos totales,
+    Counter(tipo -> repartos perdidos))
+    """
+    board_state = evaluator.board_state
+    board_flush_possible = evaluator.board_flush_possible
+    evaluate_with_board = evaluator.evaluate_with_board
+    evaluate_ranks_with_board = evaluator.evaluate_ranks_with_board
+    category_shift = PokerHandEvaluator.CATEGORY_SHIFT
+    
+    flush_possible = ProbabilityCalculator.flush_possible(community_cards)
+    available = bitboard_to_cards(FULL_DECK_MASK & ~cards_to_bitboard(community_cards))
+    needed_community = 5 - len(community_cards)
+    my_masks = [cards_to_bitboard(my_cards) for my_cards, _ in scenarios]
+    multiway = any(num_opponents > 1 for _, num_opponents in scenarios)
+    wins = [0] * len(scenarios)
+    totals = [0] * len(scenarios)
+    losing = [Counter() for _ in scenarios]
+    checks = 0
+    
+    for runout in itertools.combinations(available, needed_community):
+        runout_mask = cards_to_bitboard(runout)
+        if all(my_mask & runout_mask for my_mask in my_masks):
+            continue
+        board = board_state(community_cards + list(runout), flush_possible)
+        if flush_possible and board_flush_possible(board):
+            evaluate = evaluate_with_board
+        else:
+            evaluate = evaluate_ranks_with_board
+        
+        deck = [card for card in available if not CARD_BITS[card] & runout_mask]
+        hands = [(evaluate(board, a, b), CARD_BITS[a] | CARD_BITS[b])
+                 for a, b in itertools.combinations(deck, 2)]
+        strength_of = {mask: strength for strength, mask in hands}
+        if multiway:
+            hands.sort(reverse=True)
+        masks = [mask for _, mask in hands]
+        
+        for index, (my_cards, num_opponents) in enumerate(scenarios):
+            my_mask = my_masks[index]
+            if my_mask & runout_mask:
+                continue
+            my_strength = strength_of[my_mask]
+            for i, (strength, mask) in enumerate(hands):
+                checks += 1
+                if cancel_token is not None and not checks % CANCEL_CHECK_INTERVAL:
+                    cancel_token.raise_if_cancelled()
+                if mask & my_mask:
+                    continue
+                count = _count_disjoint_hand_sets(masks, i + 1, num_opponents - 1, mask | my_mask)
+                if not count:
+                    continue
+                totals[index] += count
+                if strength > my_strength:
+                    losing[index][strength >> category_shift] += count
+                else:
+                    wins[index] += count
+    
+    return list(zip(wins, totals, losing))
+
+
+def _exact_enumeration_worker(evaluator_name: str, my_cards: List[int], community_cards: List[int],
+                              runouts, num_opponents: int, offset: int, step: int, cancel_flag=None):
+    """Tarea de un proceso del pool: enumeración exacta de una parte de los repartos"""
+    return _enumerate_exact(get_evaluator(evaluator_name), my_cards, community_cards,
+                            runouts, num_opponents, offset, step, cancel_flag)
+
+
+def _award_pot(strengths: List[int], weight, wins: list, ties: list, shares: list, shares_sq=None) -> None:
+    """Suma weight a las victorias o empates de los jugadores con la mejor mano"""
+    best = max(strengths)
+    winners = [seat for seat, strength in enumerate(strengths) if strength == best]
+    if len(winners) == 1:
+        seat = winners[0]
+        wins[seat] += weight
+        shares[seat] += weight
+        if shares_sq is not None:
+            shares_sq[seat] += weight
+        return
+    share = weight / len(winners)
+    for seat in winners:
+        ties[seat] += weight
+        shares[seat] += share
+        if shares_sq is not None:
+            shares_sq[seat] += share * share
+
+
+def _enumerate_showdown(evaluator, hands: List[List[int]], community_cards: List[int],
+                        offset: int = 0, step: int = 1, symmetries=(),
+                        cancel_token=None) -> Tuple[list, list, list, int]:
+    """
+    Recorre todas las mesas posibles con las manos de todos los jugadores conocidas.
+    Con cambios de palo que dejan igual las manos y la mesa (symmetries, ver
+    suit_symmetries) solo se evalúa la menor mesa de cada clase de equivalencia, con peso
+    igual al número de mesas de la clase. offset/step reparten las mesas entre procesos.
+    Retorna: (victorias, empates, parte del bote por jugador, mesas)
+    """
+    board_state = evaluator.board_state
+    board_flush_possible = evaluator.board_flush_possible
+    evaluate_with_board = evaluator.evaluate_with_board
+    evaluate_ranks_with_board = evaluator.evaluate_ranks_with_board
+    
+    flush_possible = ProbabilityCalculator.flush_possible(community_cards)
+    known_cards = community_cards + [card for hand in hands for card in hand]
+    deck = sorted(bitboard_to_cards(FULL_DECK_MASK & ~cards_to_bitboard(known_cards)))
+    needed_community = 5 - len(community_cards)
+    num_seats = len(hands)
+    wins = [0] * num_seats
+    ties = [0] * num_seats
+    shares = [0.0] * num_seats
+    boards = 0
+    
+    runouts = itertools.islice(itertools.combinations(deck, needed_community), offset, None, step)
+    for index, runout in enumerate(runouts):
+        if cancel_token is not None and not index % CANCEL_CHECK_INTERVAL:
+            cancel_token.raise_if_cancelled()
+        weight = 1
+        if symmetries:
+            weight = 0
+            # Solo la menor mesa de su clase; el peso es el número de mesas distintas de la clase
+            images = {runout}
+            for table in symmetries:
+                image = tuple(sorted(table[card] for card in runout))
+                if image < runout:
+                    break
+                images.add(image)
+            else:
+                weight = len(images)
+            if not weight:
+                continue
+        boards += weight
+        
+        board = board_state(community_cards + list(runout), flush_possible)
+        if flush_possible and board_flush_possible(board):
+            evaluate = evaluate_with_board
+        else:
+            evaluate = evaluate_ranks_with_board
+        _award_pot([evaluate(board, hand[0], hand[1]) for hand in hands], weight, wins, ties, shares)
+    
+    return wins, ties, shares, boards
+
+
+def _showdown_enumeration_worker(evaluator_name: str, hands: List[List[int]], community_cards: List[int],
+                                 offset: int, step: int, symmetries, cancel_flag=None):
+    """Tarea de un proceso del pool: enumeración de una parte de las mesas de un showdown"""
+    return _enumerate_showdown(get_evaluator(evaluator_name), hands, community_cards, offset, step,
+                               symmetries, cancel_flag)
+
+
+_PROCESS_POOL = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Pool de procesos compartido por todos los cálculos (uno por núcleo).
+    Se usa 'spawn' porque la interfaz lanza los cálculos desde threads
+    """
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        _PROCESS_POOL = ProcessPoolExecutor(max_workers=process_pool_workers(),
+                                            mp_context=multiprocessing.get_context('spawn'))
+    return _PROCESS_POOL
+
+
+_CANCEL_MANAGER = None
+_CANCEL_MANAGER_LOCK = threading.Lock()
+
+
+def get_cancel_manager():
+    """
+    Manager de multiprocessing compartido que crea los Event de cancelación de las tareas
+    del pool (ver CancellationToken.pool_flag). None si no se puede arrancar
+    """
+    global _CANCEL_MANAGER
+    with _CANCEL_MANAGER_LOCK:
+        if _CANCEL_MANAGER is None:
+            try:
+                _CANCEL_MANAGER = multiprocessing.get_context('spawn').Manager()
+            except (OSError, EOFError, RuntimeError) as e:
+                print(f"No se pudo arrancar el gestor de cancelación ({e}); las tareas del pool no se podrán parar")
+                _CANCEL_MANAGER = False
+        return _CANCEL_MANAGER or None
+
+
+def _pool_cancel_flag(cancel_token) -> Optional[PoolCancelFlag]:
+    """Señal de cancelación para enviar con las tareas del pool (None sin cancel_token)"""
+    return cancel_token.pool_flag() if cancel_token is not None else None
+
+
+def _collect_results(futures: list, cancel_token=None) -> list:
+    """
+    Espera los resultados de las tareas enviadas al pool. Si se cancela el cálculo,
+    anula las tareas que aún no empezaron y lanza CalculationCancelled; las que ya están
+    en marcha paran solas con su PoolCancelFlag
+    """
+    if cancel_token is not None:
+        pending = set(futures)
+        while pending:
+            if cancel_token.cancelled:
+                for future in pending:
+                    future.cancel()
+                raise CalculationCancelled()
+            _, pending = wait(pending, timeout=CANCEL_POLL_SECONDS)
+    return [future.result() for future in futures]
+
+
+def process_pool_workers() -> int:
+    """Número de procesos del pool compartido"""
+    return os.cpu_count() or 1
+
+
+def derive_seed(seed: int, *stream) -> int:
+    """
+    Semilla de 64 bits para un flujo aleatorio independiente (por ejemplo lote y proceso)
+    derivada de la semilla base con SHA-256: los flujos no se solapan entre sí y con la
+    misma semilla base el resultado es reproducible
+    """
+    text = ':'.join(str(part) for part in (seed,) + stream)
+    return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], 'little')
+
+
+# Calculadores de cada proceso del pool (uno por evaluador), creados una sola vez
+_WORKER_CALCULATORS = {}
+
+
+def _worker_calculator(evaluator_name: str) -> 'ProbabilityCalculator':
+    """Calculador del proceso actual para el evaluador dado (sin procesos propios)"""
+    calculator = _WORKER_CALCULATORS.get(evaluator_name)
+    if calculator is None:
+        calculator = ProbabilityCalculator(evaluator_name, use_processes=False, use_preflop_table=False,
+                                           cache_size=0)
+        _WORKER_CALCULATORS[evaluator_name] = calculator
+    return calculator
+
+
+def _simulation_worker(evaluator_name: str, my_cards: List[int], community_cards: List[int],
+                       num_players: int, simulations: int, seed: int,
+                       opponent_ranges=None, sampling: str = 'random',
+                       cancel_flag=None) -> Tuple[int, Counter, int]:
+    """Tarea de un proceso del pool: un lote de simulaciones con su propio generador"""
+    calculator = _worker_calculator(evaluator_name)
+    return calculator._run_sampled_batch(my_cards, community_cards, num_players, simulations,
+                                         random.Random(seed), opponent_ranges, sampling, cancel_flag)
+
+
+def _equity_batch_worker(evaluator_name: str, community_cards: List[int], scenarios: list,
+                         options: dict, cancel_flag=None) -> List[EquityResult]:
+    """Tarea de un proceso del pool: la equity de un grupo de escenarios con la misma mesa, en orden"""
+    calculator = _worker_calculator(evaluator_name)
+    return calculator._board_group_equity(community_cards, scenarios, cancel_token=cancel_flag, **options)
+
+
+def _warm_worker(evaluator_name: str) -> int:
+    """Carga el evaluador y hace una simulación para que el proceso quede listo"""
+    _simulation_worker(evaluator_name, [48, 45], [], 2, 1, 0)
+    return os.getpid()
+
+
+# Tareas de arranque del pool enviadas por warm_process_pool
+_POOL_WARMUP = []
+_POOL_WARMUP_LOCK = threading.Lock()
+
+
+def warm_process_pool(evaluator_name: Optional[str] = None) -> list:
+    """
+    Arranca todos los procesos del pool y carga en ellos el evaluador, para que la
+    primera consulta no pague el arranque de procesos ni la importación del módulo.
+    No espera: retorna los futures por si se quiere esperar a que terminen.
+    Si el pool ya se está arrancando retorna las tareas de entonces
+    """
+    with _POOL_WARMUP_LOCK:
+        if _POOL_WARMUP:
+            return list(_POOL_WARMUP)
+        if evaluator_name is None:
+            evaluator_name = get_evaluator().name
+        workers = process_pool_workers()
+        if workers <= 1:
+            return []
+        try:
+            pool = get_process_pool()
+            # El Manager de las señales de cancelación también arranca ahora
+            get_cancel_manager()
+            # Enviar una tarea por proceso antes de que haya ninguno libre obliga a crearlos todos
+            _POOL_WARMUP.extend(pool.submit(_warm_worker, evaluator_name) for _ in range(workers))
+        except (OSError, RuntimeError) as e:
+            # Los cálculos lo volverán a intentar y, si falla, calcularán en su proceso
+            print(f"No se pudo arrancar el pool de procesos ({e})")
+        return list(_POOL_WARMUP)
+
+
+def process_pool_ready() -> bool:
+    """Indica si el pool ya arrancó todos sus procesos (ver warm_process_pool)"""
+    return bool(_POOL_WARMUP) and all(future.done() for future in _POOL_WARMUP)
+
+
+# Las 24 formas de renombrar los palos
+SUIT_PERMUTATIONS = list(itertools.permutations(range(4)))
+
+
+def canonical_state(my_cards: List[int], community_cards: List[int]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Forma canónica de (cartas propias, cartas comunitarias) salvo cambio de palos: la menor,
+    entre los 24 renombramientos de palos, de (cartas propias ordenadas, mesa ordenada).
+    A♠K♠ / Q♠J♠2♥ y A♥K♥ / Q♥J♥2♦ tienen la misma forma y la misma equity.
+    """
+    best = None
+    for permutation in SUIT_PERMUTATIONS:
+        state = (tuple(sorted((card & ~3) | permutation[card & 3] for card in my_cards)),
+                 tuple(sorted((card & ~3) | permutation[card & 3] for card in community_cards)))
+        if best is None or state < best:
+            best = state
+    return best
+
+
+def suit_symmetries(card_groups) -> List[List[int]]:
+    """
+    Cambios de palo que dejan igual cada grupo de cartas (cada mano y la mesa conocida),
+    como tablas carta -> carta, sin contar la identidad
+    """
+    groups = [sorted(group) for group in card_groups]
+    tables = []
+    for permutation in SUIT_PERMUTATIONS[1:]:
+        table = [(card & ~3) | permutation[card & 3] for card in range(52)]
+        if all(sorted(table[card] for card in group) == group for group in groups):
+            tables.append(table)
+    return tables
+
+
+# Número máximo de resultados y memoria máxima (bytes, aproximada) de la caché de cada calculador
+EQUITY_CACHE_SIZE = 4096
+EQUITY_CACHE_BYTES = 8 * 1024 * 1024
+# Memoria aproximada de cada entrada del OrderedDict, aparte de la clave y el resultado
+CACHE_ENTRY_OVERHEAD = 100
+
+
+class EquityCache:
+    """Caché LRU de resultados de equity con límite de entradas y de memoria, y contadores"""
+    
+    def __init__(self, max_entries: int = EQUITY_CACHE_SIZE, max_bytes: int = EQUITY_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # clave -> (resultado, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    @staticmethod
+    def entry_size(key, result) -> int:
+        """Memoria aproximada de una entrada: la clave y el resultado con sus tuplas y listas"""
+        size = CACHE_ENTRY_OVERHEAD
+        pending = [key, result]
+        while pending:
+            value = pending.pop()
+            size += sys.getsizeof(value)
+            if isinstance(value, (tuple, list)):
+                pending.extend(value)
+        return size
+    
+    def get(self, key, accept=None):
+        """
+        Retorna el resultado guardado (y lo marca como recién usado) o None.
+        accept: función opcional que decide si el resultado guardado sirve; si no, es un fallo
+        """
+        entry = self.entries.get(key)
+        if entry is None or (accept is not None and not accept(entry[0])):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+    
+    def put(self, key, result) -> None:
+        """
+        Guarda un resultado; mientras se supere el número de entradas o la memoria,
+        descarta los menos usados
+        """
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        size = self.entry_size(key, result)
+        self.entries[key] = (result, size)
+        self.bytes += size
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores"""
+        self.entries.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def stats(self) -> dict:
+        """Retorna {'entries', 'max_entries', 'bytes', 'max_bytes', 'hits', 'misses', 'evictions', 'hit_rate'}"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Caché en disco: variable de entorno con su ruta, archivo por defecto (en la carpeta del
+# usuario), máximo de entradas y cada cuántas escrituras se comprueba ese máximo
+PERSISTENT_CACHE_ENV_VAR = 'POKER_EQUITY_CACHE'
+PERSISTENT_CACHE_FILE = '.poker_equity_cache.sqlite3'
+PERSISTENT_CACHE_MAX_ENTRIES = 200000
+PERSISTENT_CACHE_TRIM_INTERVAL = 1000
+# Versión de los resultados guardados, parte de la clave: hay que subirla al cambiar el
+# evaluador, el muestreo o cualquier otra cosa que cambie los resultados. Las entradas de
+# otras versiones no se usan y compact() las borra
+PERSISTENT_CACHE_VERSION = 1
+# Letras de los palos en las claves de texto (mismo orden que CARD_SUIT_SYMBOLS)
+CARD_SUIT_LETTERS = 'shdc'
+
+
+def state_key_string(cache_key) -> str:
+    """
+    Clave de caché en texto: 'AsKs|Qs7h2d|3|' (cartas canónicas, jugadores y rangos de los
+    oponentes como 'AKs:1,QQ:1;*', con * para mano aleatoria)
+    """
+    (my_cards, community_cards), num_players, range_keys = cache_key
+    
+    def cards_text(cards):
+        return ''.join(CARD_RANKS[card >> 2] + CARD_SUIT_LETTERS[card & 3] for card in cards)
+    
+    ranges_text = ''
+    if range_keys:
+        ranges_text = ';'.join(','.join(f"{hand_class}:{weight:g}" for hand_class, weight in key) or '*'
+                               for (key,) in range_keys)
+    return f"{cards_text(my_cards)}|{cards_text(community_cards)}|{num_players}|{ranges_text}"
+
+
+class PersistentEquityCache:
+    """
+    Caché de resultados de equity en disco (SQLite en modo WAL), compartida entre sesiones
+    y entre varias instancias a la vez. La clave es la versión de los resultados (ver
+    PERSISTENT_CACHE_VERSION) y el estado canónico en texto (ver state_key_string). Cada
+    entrada guarda sus muestras y su error estándar: un cálculo posterior más preciso la
+    sustituye y uno menos preciso no. Con más de max_entries se borran las usadas hace más
+    tiempo; compact() además borra las de otras versiones y reduce el archivo
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_entries: int = PERSISTENT_CACHE_MAX_ENTRIES,
+                 version: int = PERSISTENT_CACHE_VERSION):
+        if path is None:
+            path = (os.environ.get(PERSISTENT_CACHE_ENV_VAR)
+                    or os.path.join(os.path.expanduser('~'), PERSISTENT_CACHE_FILE))
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.puts_since_trim = 0
+        # Una conexión compartida por los threads del proceso, protegida por el lock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        with self.lock:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            columns = [row[1] for row in self.connection.execute('PRAGMA table_info(equity)')]
+            if columns and 'version' not in columns:
+                # Archivo de antes de versionar las entradas: sus resultados no valen
+                self.connection.execute('DROP TABLE equity')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS equity ('
+                'version INTEGER NOT NULL, state TEXT NOT NULL, probability REAL NOT NULL, '
+                'losing_hands TEXT NOT NULL, samples INTEGER NOT NULL, std_error REAL NOT NULL, '
+                'exact INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (version, state))')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS equity_last_used ON equity (last_used)')
+            self.connection.commit()
+    
+    def get(self, key, accept=None) -> Optional[EquityResult]:
+        """Como EquityCache.get; key es la clave de la caché en memoria"""
+        state = state_key_string(key)
+        with self.lock:
+            try:
+                row = self.connection.execute(
+                    'SELECT probability, losing_hands, samples, std_error, exact FROM equity '
+                    'WHERE version = ? AND state = ?', (self.version, state)).fetchone()
+                result = None
+                if row is not None:
+                    probability, losing_hands, samples, std_error, exact = row
+                    result = EquityResult(probability, [tuple(item) for item in json.loads(losing_hands)],
+                                          samples, std_error, bool(exact))
+                if result is None or (accept is not None and not accept(result)):
+                    self.misses += 1
+                    return None
+                self.connection.execute('UPDATE equity SET last_used = ? WHERE version = ? AND state = ?',
+                                        (time.time(), self.version, state))
+                self.connection.commit()
+            except sqlite3.Error as e:
+                print(f"Error leyendo la caché en disco: {e}")
+                return None
+        self.hits += 1
+        return result
+    
+    def put(self, key, result: EquityResult) -> None:
+        """Guarda un resultado si no hay ninguno para ese estado o si es más preciso que el guardado"""
+        state = state_key_string(key)
+        with self.lock:
+            try:
+                # Más preciso: exacto frente a simulado, o menor error estándar (a igual error, más muestras)
+                self.connection.execute(
+                    'INSERT INTO equity (version, state, probability, losing_hands, samples, std_error, exact, '
+                    'last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (version, state) DO UPDATE SET probability = excluded.probability, '
+                    'losing_hands = excluded.losing_hands, samples = excluded.samples, '
+                    'std_error = excluded.std_error, exact = excluded.exact, last_used = excluded.last_used '
+                    'WHERE excluded.exact > equity.exact OR (equity.exact = 0 AND excluded.exact = 0 AND '
+                    '(excluded.std_error < equity.std_error OR '
+                    '(excluded.std_error = equity.std_error AND excluded.samples > equity.samples)))',
+                    (self.version, state, result.probability, json.dumps(result.top_losing_hands), result.samples,
+                     result.std_error, int(result.exact), time.time()))
+                self.writes += 1
+                self.puts_since_trim += 1
+                if self.puts_since_trim >= PERSISTENT_CACHE_TRIM_INTERVAL:
+                    self._trim()
+                self.connection.commit()
+            except sqlite3.Error as e:
+                print(f"Error guardando en la caché en disco: {e}")
+    
+    def _trim(self) -> int:
+        """Borra las entradas usadas hace más tiempo por encima de max_entries (con el lock tomado)"""
+        self.puts_since_trim = 0
+        cursor = self.connection.execute(
+            'DELETE FROM equity WHERE rowid IN '
+            '(SELECT rowid FROM equity ORDER BY last_used DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+        return cursor.rowcount
+    
+    def compact(self) -> int:
+        """
+        Borra las entradas de otras versiones, aplica el límite de entradas, vuelca el
+        registro WAL al archivo y lo reduce (VACUUM). Retorna las entradas borradas
+        """
+        with self.lock:
+            try:
+                deleted = self.connection.execute('DELETE FROM equity WHERE version != ?',
+                                                  (self.version,)).rowcount
+                deleted += self._trim()
+                self.connection.commit()
+                self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                self.connection.execute('VACUUM')
+                return deleted
+            except sqlite3.Error as e:
+                print(f"No se pudo compactar la caché en disco: {e}")
+                return 0
+    
+    def clear(self) -> None:
+        """Borra todas las entradas y reinicia los contadores"""
+        with self.lock:
+            self.connection.execute('DELETE FROM equity')
+            self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+    
+    def stats(self) -> dict:
+        """Retorna {'path', 'entries', 'max_entries', 'bytes', 'hits', 'misses', 'writes', 'hit_rate'}"""
+        with self.lock:
+            entries = self.connection.execute('SELECT COUNT(*) FROM equity').fetchone()[0]
+        size = sum(os.path.getsize(path) for path in (self.path, self.path + '-wal') if os.path.exists(path))
+        lookups = self.hits + self.misses
+        return {
+            'path': self.path,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'bytes': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+    
+    def close(self) -> None:
+        """Cierra la conexión"""
+        with self.lock:
+            self.connection.close()
+
+
+def hand_class_combos(hand_class: str) -> List[Tuple[int, int]]:
+    """
+    Combinaciones concretas de una clase de mano: 'AA' (6), 'AKs' (4), 'AKo' (12), 'AK' (16)
+    """
+    high = CARD_RANKS.index(hand_class[0].upper())
+    low = CARD_RANKS.index(hand_class[1].upper())
+    kind = hand_class[2:3].lower()
+    if high == low:
+        return [(high * 4 + s1, low * 4 + s2) for s1 in range(4) for s2 in range(s1 + 1, 4)]
+    return [(high * 4 + s1, low * 4 + s2) for s1 in range(4) for s2 in range(4)
+            if kind == '' or (kind == 's') == (s1 == s2)]
+
+
+class AliasSampler:
+    """
+    Muestreo ponderado en O(1) con el método alias (Vose): cada sorteo usa un solo
+    número aleatorio, sea cual sea el número de elementos y sus pesos
+    """
+    
+    def __init__(self, items: list, weights: List[float]):
+        count = len(items)
+        total = float(sum(weights))
+        scaled = [weight * count / total for weight in weights]
+        self.items = list(items)
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Lo que queda tiene probabilidad 1 (salvo errores de redondeo)
+    
+    def sample(self, random_float):
+        """Retorna un elemento al azar según su peso (random_float: función que da [0, 1))"""
+        x = random_float() * len(self.items)
+        i = int(x)
+        return self.items[i] if x - i < self.prob[i] else self.items[self.alias[i]]
+
+
+class HandRange:
+    """
+    Rango de manos ponderado sobre las 1326 combinaciones de 2 cartas.
+    weights: {(carta1, carta2): peso}. Los rangos creados desde clases de mano ('AKs', 'QQ'...)
+    son simétricos respecto a los palos y tienen una clave (key) para la caché.
+    """
+    
+    def __init__(self, weights: dict, key=None):
+        self.weights = {combo: weight for combo, weight in weights.items() if weight > 0}
+        self.key = key
+    
+    def __len__(self) -> int:
+        return len(self.weights)
+    
+    @classmethod
+    def from_classes(cls, hand_classes) -> 'HandRange':
+        """Rango desde clases de mano: lista ['AA', 'AKs', ...] (peso 1) o {'AKo': 0.5, ...}"""
+        if not isinstance(hand_classes, dict):
+            hand_classes = {hand_class: 1.0 for hand_class in hand_classes}
+        weights = {}
+        for hand_class, weight in hand_classes.items():
+            for combo in hand_class_combos(hand_class):
+                weights[combo] = weight
+        key = tuple(sorted((hand_class, float(weight)) for hand_class, weight in hand_classes.items()
+                           if weight > 0))
+        return cls(weights, key)
+    
+    @classmethod
+    def from_value(cls, value) -> Optional['HandRange']:
+        """Acepta un HandRange, una lista o diccionario de clases de mano, o None (mano aleatoria)"""
+        if value is None or isinstance(value, HandRange):
+            return value
+        return cls.from_classes(value)
+    
+    def sampler(self, dead_mask: int = 0) -> Optional[AliasSampler]:
+        """
+        Tabla alias de las combinaciones que no usan cartas muertas (dead_mask, bitboard).
+        Los elementos son (máscara, carta1, carta2). None si no queda ninguna combinación.
+        """
+        items = []
+        weights = []
+        for (card1, card2), weight in self.weights.items():
+            mask = CARD_BITS[card1] | CARD_BITS[card2]
+            if not mask & dead_mask:
+                items.append((mask, card1, card2))
+                weights.append(weight)
+        if not items:
+            return None
+        return AliasSampler(items, weights)
+
+
+class PreflopEquityTable:
+    """
+    Equity precalculada de las 169 manos iniciales contra 1-9 oponentes aleatorios.
+    El archivo (preflop_equity_table.json) lo genera build_preflop_equity_table.py y guarda,
+    para cada mano (clave de PreflopStrategy.normalize_hand: 'AA', 'AKs', 'AKo'...) y cada
+    número de oponentes, las victorias, los empates y las 3 manos que más veces ganan,
+    todo en número de simulaciones sobre metadata['simulations'].
+    """
+    
+    TABLE_FILE = "preflop_equity_table.json"
+    MAX_OPPONENTS = 9
+    
+    def __init__(self, table_path: Optional[str] = None):
+        if table_path is None:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            table_path = os.path.join(script_dir, self.TABLE_FILE)
+        self.table_path = table_path
+        with open(table_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.metadata = data['metadata']
+        self.simulations = self.metadata['simulations']
+        # Clase de mano -> lista (índice = oponentes - 1) de [victorias, empates, [[tipo, veces]...]]
+        self.equity = data['equity']
+    
+    @staticmethod
+    def hand_class(card1: int, card2: int) -> str:
+        """Clase de la mano ('AKs', 'QQ', '72o') con la misma notación que las tablas preflop"""
+        return PreflopStrategy.normalize_hand(card_to_str(card1), card_to_str(card2))
+    
+    def get(self, hand_class: str, num_opponents: int) -> Optional[dict]:
+        """
+        Retorna {'win', 'tie', 'loss', 'top_losing_hands'} como fracciones, o None si la
+        combinación no está en la tabla. Las tablas de build_preflop_equity_table.py cuentan
+        los empates como victorias (tie = 0)
+        """
+        entries = self.equity.get(hand_class)
+        if entries is None or not 1 <= num_opponents <= len(entries):
+            return None
+        wins, ties, top_losing = entries[num_opponents - 1]
+        total = self.simulations
+        return {
+            'win': wins / total,
+            'tie': ties / total,
+            'loss': (total - wins - ties) / total,
+            'top_losing_hands': [(ProbabilityCalculator.HAND_NAMES.get(rank, "Desconocido"), count / total)
+                                 for rank, count in top_losing],
+        }
+    
+    def lookup(self, my_cards: List[int], num_opponents: int) -> Optional[EquityResult]:
+        """Equity de la mano preflop en el mismo formato que calculate_equity (o None)"""
+        entries = self.equity.get(self.hand_class(my_cards[0], my_cards[1]))
+        if entries is None or not 1 <= num_opponents <= len(entries):
+            return None
+        wins, ties, top_losing = entries[num_opponents - 1]
+        total = self.simulations
+        top_losing_hands = [(ProbabilityCalculator.HAND_NAMES.get(rank, "Desconocido"), count)
+                            for rank, count in top_losing]
+        # Los empates cuentan como victoria, igual que en la simulación
+        return EquityResult((wins + ties) / total, top_losing_hands, total,
+                            binomial_std_error(wins + ties, total), False)
+
+
+_preflop_equity_table = None
+_preflop_equity_table_loaded = False
+
+
+def get_preflop_equity_table() -> Optional[PreflopEquityTable]:
+    """Retorna la tabla de equity preflop del proceso, o None si no hay archivo"""
+    global _preflop_equity_table, _preflop_equity_table_loaded
+    if not _preflop_equity_table_loaded:
+        _preflop_equity_table_loaded = True
+        try:
+            _preflop_equity_table = PreflopEquityTable()
+        except FileNotFoundError:
+            _preflop_equity_table = None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error al cargar la tabla de equity preflop - {e}")
+            _preflop_equity_table = None
+    return _preflop_equity_table
 
 
 class ProbabilityCalculator:
-    """Calcula probabilidades usando simulación Monte Carlo"""
+    """Calcula probabilidades por enumeración exacta o simulación Monte Carlo"""
     
-    def __init__(self):
+    HAND_NAMES = {
+        1: "Carta Alta", 2: "Par", 3: "Doble Par", 4: "Trío",
+        5: "Escalera", 6: "Color", 7: "Full House", 8: "Poker",
+        9: "Escalera de Color", 10: "Escalera Real"
+    }
+    
+    def __init__(self, evaluator=None, exact_enumeration_limit: int = EXACT_ENUMERATION_LIMIT,
+                 use_processes: bool = True, use_preflop_table: bool = True,
+                 cache_size: int = EQUITY_CACHE_SIZE, cache_bytes: int = EQUITY_CACHE_BYTES,
+                 persistent_cache: Optional[PersistentEquityCache] = None):
+        # Evaluador de manos: un objeto evaluador o su nombre ('reference', 'lookup', 'numpy', 'bitboard').
+        # Sin indicar, se usa la variable de entorno POKER_EVALUATOR (ver get_evaluator)
+        if evaluator is None or isinstance(evaluator, str):
+            evaluator = get_evaluator(evaluator)
+        self.evaluator = evaluator
         self.ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']  # Usar 'T' en lugar de '10'
         self.suits = ['♠', '♥', '♦', '♣']
-        self.all_cards = [rank + suit for rank in self.ranks for suit in self.suits]
+        # Las cartas se representan como enteros 0-51 (ver CARD_NAMES)
+        self.all_cards = list(range(52))
         # Pre-calcular set para búsqueda más rápida
         self.all_cards_set = set(self.all_cards)
+        # El mazo completo como bitboard de 52 bits
+        self.all_cards_mask = FULL_DECK_MASK
+        # Máximo de repartos para enumerar en lugar de simular (0 = siempre simular)
+        self.exact_enumeration_limit = exact_enumeration_limit
+        # Repartir la enumeración exacta entre procesos
+        self.use_processes = use_processes
+        # Equity preflop precalculada (None si no hay tabla o no se quiere usar)
+        self.preflop_table = get_preflop_equity_table() if use_preflop_table else None
+        # Caché de resultados por estado canónico, con máximo de entradas y de memoria (0 = sin caché)
+        self.cache = EquityCache(cache_size, cache_bytes) if cache_size and cache_bytes else None
+        # Caché en disco compartida entre sesiones e instancias (PersistentEquityCache o None)
+        self.persistent_cache = persistent_cache
+        # Velocidad de la simulación en este proceso (manos evaluadas por segundo, ver
+        # simulation_seconds); se actualiza con lo medido en cada simulación
+        self.simulation_hands_per_second = SIMULATION_HANDS_PER_SECOND
+        # Lo mismo para los lotes repartidos en el pool, con el envío incluido (None hasta medirlo)
+        self.pool_hands_per_second = None
     
-    def get_available_cards(self, known_cards: List[str]) -> List[str]:
+    def get_available_mask(self, known_cards: List[int]) -> int:
+        """Retorna las cartas disponibles como bitboard (el mazo sin las cartas conocidas)"""
+        # Aceptar cartas en texto ('10♠', 'T♠') o ya convertidas a enteros
+        return self.all_cards_mask & ~cards_to_bitboard(cards_to_ints(known_cards))
+    
+    def get_available_cards(self, known_cards: List[int]) -> List[int]:
         """Retorna las cartas disponibles (no conocidas) - optimizado"""
-        # Normalizar las cartas conocidas para comparación (10 -> T)
-        normalized_known = set()
-        for card in known_cards:
-            if card.startswith('10'):
-                normalized_known.add('T' + card[2:])
-            else:
-                normalized_known.add(card)
-        
-        # Filtrar cartas disponibles
-        return [card for card in self.all_cards if card not in normalized_known]
+        return bitboard_to_cards(self.get_available_mask(known_cards))
+    
+    @staticmethod
+    def flush_possible(community_cards: List[int]) -> bool:
+        """
+        Indica si algún jugador puede terminar con color: hace falta un palo con
+        (cartas en la mesa + cartas de mesa por salir + 2 propias) >= 5
+        """
+        remaining_community = 5 - len(community_cards)
+        suit_counts = [0] * 4
+        for card in community_cards:
+            suit_counts[card & 3] += 1
+        return max(suit_counts) + remaining_community + 2 >= 5
     
     def calculate_win_probability(self, 
-                                 my_cards: List[str], 
-                                 community_cards: List[str],
+                                 my_cards: List[int], 
+                                 community_cards: List[int],
                                  num_players: int,
                                  simulations: int = 20000) -> Tuple[float, List[Tuple[str, int]]]:
         """
-        Calcula la probabilidad de ganar usando simulación Monte Carlo
+        Calcula la probabilidad de ganar (exacta si quedan pocos repartos, si no Monte Carlo)
         Retorna: (probabilidad, lista de (mano_ganadora, frecuencia))
         """
+        result = self.calculate_equity(my_cards, community_cards, num_players, simulations)
+        return (result.probability, result.top_losing_hands)
+    
+    def calculate_equity(self,
+                         my_cards: List[int],
+                         community_cards: List[int],
+                         num_players: int,
+                         simulations: int = 20000,
+                         exact: Optional[bool] = None,
+                         target_std_error: Optional[float] = None,
+                         confidence_half_width: Optional[float] = None,
+                         confidence: float = 0.95,
+                         max_simulations: int = ADAPTIVE_MAX_SIMULATIONS,
+                         time_budget: Optional[float] = None,
+                         seed: Optional[int] = None,
+                         opponent_ranges: Optional[list] = None,
+                         cancel_token: Optional[CancellationToken] = None,
+                         sampling: str = 'random') -> EquityResult:
+        """
+        Calcula la equity con su número de muestras y su error estándar.
+        exact: None elige automáticamente (enumeración exacta si el número de repartos no
+        supera exact_enumeration_limit y se estima más rápida que la simulación), True
+        fuerza la enumeración y False la simulación
+        target_std_error / confidence_half_width: Monte Carlo adaptativo; se simula por lotes
+        hasta alcanzar ese error estándar o esa semianchura del intervalo de confianza
+        (al nivel `confidence`), con un máximo de max_simulations. Sin ellos se hacen
+        exactamente `simulations` simulaciones.
+        time_budget: tiempo máximo en segundos (por ejemplo 0.05). Se retorna la mejor
+        estimación alcanzable en ese tiempo, con hasta max_simulations simulaciones; la
+        enumeración exacta solo se elige si cabe en el presupuesto.
+        seed: semilla para que la simulación sea reproducible (también en paralelo)
+        Sin cartas comunitarias se usa la tabla de equity preflop si está disponible.
+        Los resultados se guardan en una caché LRU por estado canónico (salvo cambio de
+        palos) y número de jugadores; sin seed, una entrada al menos tan precisa como lo
+        pedido se retorna sin recalcular.
+        opponent_ranges: rango de manos de cada oponente (HandRange, lista o diccionario de
+        clases de mano como 'AKs', o None para mano aleatoria). Con rangos siempre se simula.
+        cancel_token: CancellationToken para cancelar desde otro thread; el cálculo se
+        detiene en milisegundos lanzando CalculationCancelled.
+        sampling: muestreo de la simulación, 'random', 'stratified' o 'qmc' (ver iter_simulation)
+        """
+        result = EquityResult(0.0, [], 0, 0.0, False)
+        for result in self.iter_equity(my_cards, community_cards, num_players, simulations, exact,
+                                       target_std_error, confidence_half_width, confidence,
+                                       max_simulations, time_budget, seed, opponent_ranges,
+                                       cancel_token=cancel_token, sampling=sampling):
+            pass
+        return result
+    
+    def iter_equity(self,
+                    my_cards: List[int],
+                    community_cards: List[int],
+                    num_players: int,
+                    simulations: int = 20000,
+                    exact: Optional[bool] = None,
+                    target_std_error: Optional[float] = None,
+                    confidence_half_width: Optional[float] = None,
+                    confidence: float = 0.95,
+                    max_simulations: int = ADAPTIVE_MAX_SIMULATIONS,
+                    time_budget: Optional[float] = None,
+                    seed: Optional[int] = None,
+                    opponent_ranges: Optional[list] = None,
+                    snapshot_every: int = SIMULATION_BATCH_SIZE,
+                    cancel_token: Optional[CancellationToken] = None,
+                    sampling: str = 'random'):
+        """
+        Versión generadora de calculate_equity (mismos parámetros): al simular produce un
+        EquityResult parcial cada snapshot_every simulaciones (probabilidad, error estándar
+        y manos que me ganan hasta ese momento), y el último es el resultado final. Quien
+        lo consume puede mostrar resultados parciales y dejar de iterar cuando le baste.
+        Si la simulación usa el pool de procesos, los lotes son de snapshot_every por
+        proceso (ver iter_simulation), así que hay un resultado cada snapshot_every × procesos.
+        La tabla preflop, la enumeración exacta y la caché producen un solo resultado.
+        """
         if len(my_cards) < 2:
-            return (0.0, [])
+            yield EquityResult(0.0, [], 0, 0.0, False)
+            return
         
-        known_cards = my_cards + community_cards
-        wins = 0
-        losing_hands = Counter()  # Contador de manos que me ganan
+        # Convertir a enteros una sola vez (si vienen como texto)
+        my_cards = cards_to_ints(my_cards)
+        community_cards = cards_to_ints(community_cards)
         
-        hand_names = {
-            1: "Carta Alta", 2: "Par", 3: "Doble Par", 4: "Trío",
-            5: "Escalera", 6: "Color", 7: "Full House", 8: "Poker",
-            9: "Escalera de Color", 10: "Escalera Real"
-        }
+        num_opponents = num_players - 1
+        if num_opponents < 1:
+            # Sin oponentes siempre se gana
+            yield EquityResult(1.0, [], 1, 0.0, True)
+            return
         
-        # Pre-calcular cartas disponibles una sola vez
-        available_cards = self.get_available_cards(known_cards)
-        total_needed = (num_players - 1) * 2 + (5 - len(community_cards))
+        if confidence_half_width is not None:
+            half_width_error = confidence_half_width / normal_quantile(confidence)
+            if target_std_error is None or half_width_error < target_std_error:
+                target_std_error = half_width_error
+        
+        # Estados equivalentes salvo cambio de palos comparten resultado en la caché
+        opponent_ranges = self._normalize_ranges(opponent_ranges, num_opponents, my_cards + community_cards)
+        range_keys = None
+        if opponent_ranges:
+            # Los rangos no dependen del orden de los oponentes; sin clave no se usa la caché
+            range_keys = tuple(sorted((hand_range.key if hand_range is not None else (),)
+                                      for hand_range in opponent_ranges))
+        
+        cache_key = None
+        if ((self.cache is not None or self.persistent_cache is not None) and seed is None
+                and not (opponent_ranges and any(hand_range is not None and hand_range.key is None
+                                                 for hand_range in opponent_ranges))):
+            cache_key = (canonical_state(my_cards, community_cards), num_players, range_keys)
+            budget_simulations = None
+            if time_budget is not None:
+                budget_simulations = min(max_simulations, self.budget_simulations(time_budget, num_players))
+            cached = self._cache_get(cache_key, lambda result: self._cached_result_usable(
+                result, simulations, exact, target_std_error, budget_simulations))
+            if cached is not None:
+                yield cached
+                return
         
-        for _ in range(simulations):
-            # Crear copia del mazo y barajar
-            deck = available_cards.copy()
-            random.shuffle(deck)
-            
-            # Verificar que tenemos suficientes cartas
-            if len(deck) < total_needed:
-                # Si no hay suficientes cartas, saltar esta simulación
-                continue
-            
-            # Repartir cartas a los otros jugadores (más eficiente)
-            other_players_cards = []
-            deck_index = 0
-            
-            for _ in range(num_players - 1):
-                # Cada jugador necesita 2 cartas
-                player_cards = [deck[deck_index], deck[deck_index + 1]]
-                deck_index += 2
-                other_players_cards.append(player_cards)
-            
-            # Completar las cartas comunitarias si faltan
-            needed_community = 5 - len(community_cards)
-            remaining_community = deck[deck_index:deck_index + needed_community]
-            all_community = community_cards + remaining_community
-            
-            # Evaluar mi mano
-            my_hand = my_cards + all_community
-            my_evaluation = PokerHandEvaluator.evaluate_hand(my_hand)
+        result = None
+        for result in self._iter_compute_equity(my_cards, community_cards, num_players, simulations,
+                                                exact, target_std_error, max_simulations, time_budget,
+                                                seed, opponent_ranges, snapshot_every, cancel_token,
+                                                sampling):
+            yield result
+        # Solo llega aquí si se consumió hasta el final: el resultado está completo
+        if cache_key is not None and result is not None and result.samples > 0:
+            self._cache_put(cache_key, result)
+    
+    def _cache_get(self, key, accept) -> Optional[EquityResult]:
+        """Busca en la caché en memoria y después en la de disco (lo encontrado en disco pasa a memoria)"""
+        result = self.cache.get(key, accept) if self.cache is not None else None
+        if result is None and self.persistent_cache is not None:
+            result = self.persistent_cache.get(key, accept)
+            if result is not None and self.cache is not None:
+                self.cache.put(key, result)
+        return result
+    
+    def _cache_put(self, key, result: EquityResult) -> None:
+        """Guarda un resultado en la caché en memoria y en la de disco"""
+        if self.cache is not None:
+            self.cache.put(key, result)
+        if self.persistent_cache is not None:
+            self.persistent_cache.put(key, result)
+    
+    @staticmethod
+    def _cached_result_usable(cached: EquityResult, simulations: int, exact: Optional[bool],
+                              target_std_error: Optional[float],
+                              budget_simulations: Optional[int] = None) -> bool:
+        """
+        Indica si un resultado de la caché es al menos tan preciso como lo que se pide.
+        budget_simulations: con límite de tiempo, las simulaciones que cabrían en él; un
+        resultado que no llega a target_std_error vale si tiene casi tantas (ver
+        DEADLINE_CACHE_FRACTION), porque recalcular no lo mejoraría
+        """
+        if cached.exact:
+            return True
+        if exact:
+            return False
+        if target_std_error is not None and cached.std_error <= target_std_error:
+            return True
+        if budget_simulations is not None:
+            return cached.samples >= budget_simulations * DEADLINE_CACHE_FRACTION
+        if target_std_error is not None:
+            return False
+        return cached.samples >= simulations
+    
+    def simulation_seconds(self, simulations: int, num_players: int, workers: int = 1) -> float:
+        """Tiempo estimado de `simulations` simulaciones repartidas entre `workers` procesos"""
+        hands = simulations * (num_players + SIMULATION_OVERHEAD_HANDS)
+        if workers > 1 and self.pool_hands_per_second:
+            return hands / self.pool_hands_per_second
+        return hands / (self.simulation_hands_per_second * workers)
+    
+    def budget_simulations(self, time_budget: float, num_players: int) -> int:
+        """Simulaciones que caben en time_budget segundos (con el pool si ya está listo)"""
+        workers = self._simulation_workers(PARALLEL_MIN_SIMULATIONS) if process_pool_ready() else 1
+        return int(time_budget / self.simulation_seconds(1, num_players, workers))
+    
+    def _iter_compute_equity(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                             simulations: int, exact: Optional[bool], target_std_error: Optional[float],
+                             max_simulations: int, time_budget: Optional[float],
+                             seed: Optional[int], opponent_ranges=None,
+                             snapshot_every: int = SIMULATION_BATCH_SIZE,
+                             cancel_token: Optional[CancellationToken] = None,
+                             sampling: str = 'random'):
+        """Elige entre tabla preflop, enumeración exacta y simulación (ver calculate_equity)"""
+        num_opponents = num_players - 1
+        if not opponent_ranges:
+            # La tabla preflop y la enumeración exacta suponen oponentes con manos aleatorias
+            # Preflop: la tabla precalculada responde sin simular si es tan precisa como se pide
+            result = self._preflop_table_result(my_cards, community_cards, num_opponents, exact,
+                                                target_std_error)
+            if result is not None:
+                yield result
+                return
             
-            # Evaluar manos de otros jugadores
-            # Encontrar la mejor mano entre todos los oponentes
-            best_opponent_evaluation = None
-            best_opponent_rank = 0
+            if exact is None:
+                exact = self._prefer_exact(my_cards, community_cards, num_players, simulations,
+                                           target_std_error, max_simulations, time_budget)
             
-            for other_cards in other_players_cards:
-                other_hand = other_cards + all_community
-                other_evaluation = PokerHandEvaluator.evaluate_hand(other_hand)
-                other_rank, _ = other_evaluation
+            if exact:
+                yield self.calculate_exact(my_cards, community_cards, num_players, cancel_token)
+                return
+        
+        if target_std_error is not None or time_budget is not None:
+            simulations = max_simulations
+        yield from self.iter_simulation(my_cards, community_cards, num_players, simulations,
+                                        target_std_error=target_std_error, batch_size=snapshot_every,
+                                        time_budget=time_budget, seed=seed,
+                                        opponent_ranges=opponent_ranges, cancel_token=cancel_token,
+                                        sampling=sampling)
+    
+    def _prefer_exact(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                      simulations: int, target_std_error: Optional[float], max_simulations: int,
+                      time_budget: Optional[float]) -> bool:
+        """
+        Elige la enumeración exacta si no supera exact_enumeration_limit repartos y se estima
+        más rápida que la simulación pedida (o, con límite de tiempo, si cabe en él)
+        """
+        num_available = 52 - len(my_cards) - len(community_cards)
+        needed_community = 5 - len(community_cards)
+        num_opponents = num_players - 1
+        deals = count_exact_deals(num_available, needed_community, num_opponents)
+        if not 0 < deals <= self.exact_enumeration_limit:
+            return False
+        exact_workers = 1
+        if (self.use_processes and deals >= EXACT_PARALLEL_MIN_DEALS
+                and getattr(self.evaluator, 'name', None) in EVALUATOR_BACKENDS):
+            exact_workers = process_pool_workers()
+        exact_seconds = estimate_exact_seconds(num_available, needed_community, num_opponents, exact_workers)
+        if time_budget is not None:
+            return exact_seconds <= time_budget
+        if target_std_error is not None:
+            # Simulaciones necesarias en el peor caso (probabilidad 0,5)
+            simulations = min(max_simulations, math.ceil(0.25 / (target_std_error * target_std_error)))
+        simulation_seconds = self.simulation_seconds(simulations, num_players,
+                                                     self._simulation_workers(simulations))
+        return exact_seconds <= simulation_seconds
+    
+    def _preflop_table_result(self, my_cards: List[int], community_cards: List[int], num_opponents: int,
+                              exact: Optional[bool], target_std_error: Optional[float]) -> Optional[EquityResult]:
+        """Resultado de la tabla preflop si se puede usar y es tan preciso como se pide (si no, None)"""
+        if community_cards or self.preflop_table is None or exact is True:
+            return None
+        result = self.preflop_table.lookup(my_cards, num_opponents)
+        if result is not None and (target_std_error is None or result.std_error <= target_std_error):
+            return result
+        return None
+    
+    def calculate_equity_batch(self, scenarios, simulations: int = 20000, exact: Optional[bool] = None,
+                               target_std_error: Optional[float] = None, seed: Optional[int] = None,
+                               sampling: str = 'random',
+                               cancel_token: Optional[CancellationToken] = None) -> List[EquityResult]:
+        """
+        Calcula la equity de muchos escenarios (my_cards, community_cards, num_players) de
+        una lista o iterador y retorna los resultados en el mismo orden.
+        Los escenarios iguales salvo cambio de palos se calculan una sola vez y la caché y la
+        tabla preflop responden sin simular. El resto se agrupa por mesa: los escenarios
+        exactos de una misma mesa comparten la enumeración (cada mesa completa y sus manos
+        se evalúan una sola vez, ver _board_group_equity) y los demás se simulan. Con varios
+        núcleos los grupos se reparten entre los procesos del pool. Los demás parámetros son
+        los de calculate_equity; con seed cada escenario usa una semilla derivada de la base
+        y de su estado canónico
+        """
+        keys = []
+        scenario_cards = {}  # Clave canónica -> cartas del primer escenario con esa clave
+        for my_cards, community_cards, num_players in scenarios:
+            my_cards = cards_to_ints(my_cards)
+            community_cards = cards_to_ints(community_cards)
+            # El propio estado canónico sirve como clave: la equity no cambia
+            key = canonical_state(my_cards, community_cards) + (num_players,)
+            keys.append(key)
+            scenario_cards.setdefault(key, (my_cards, community_cards))
+        
+        options = {'simulations': simulations, 'exact': exact, 'target_std_error': target_std_error,
+                   'sampling': sampling}
+        
+        # Lo que responden la caché o la tabla preflop no se calcula
+        results = {}
+        to_compute = []
+        for key in scenario_cards:
+            my_cards, community_cards, num_players = key
+            result = None
+            if seed is None:
+                result = self._cache_get(((my_cards, community_cards), num_players, None),
+                                         lambda cached: self._cached_result_usable(
+                                             cached, simulations, exact, target_std_error))
+            if result is None and len(my_cards) >= 2 and num_players >= 2:
+                result = self._preflop_table_result(list(my_cards), list(community_cards),
+                                                    num_players - 1, exact, target_std_error)
+            if result is not None:
+                results[key] = result
+            else:
+                to_compute.append(key)
+        
+        # Grupos de escenarios con la misma mesa (la real, no la canónica de cada escenario)
+        board_groups = {}
+        for key in to_compute:
+            my_cards, community_cards = scenario_cards[key]
+            seed_key = derive_seed(seed, *key) if seed is not None else None
+            board_groups.setdefault(tuple(sorted(community_cards)), []).append(
+                (key, (my_cards, key[2], seed_key)))
+        
+        workers = 1
+        if (self.use_processes and len(to_compute) > 1
+                and getattr(self.evaluator, 'name', None) in EVALUATOR_BACKENDS):
+            workers = process_pool_workers()
+        # Con varios procesos, grupos de como mucho chunk_size escenarios (varias tareas por
+        # proceso para repartir bien la carga)
+        chunk_size = math.ceil(len(to_compute) / (workers * 4)) if workers > 1 else len(to_compute)
+        tasks = []
+        for community_cards, group in sorted(board_groups.items()):
+            for start in range(0, len(group), chunk_size):
+                tasks.append((list(community_cards), group[start:start + chunk_size]))
+        
+        def compute_locally():
+            return [self._board_group_equity(community_cards, [scenario for _, scenario in group],
+                                             cancel_token=cancel_token, **options)
+                    for community_cards, group in tasks]
+        
+        if workers > 1 and tasks:
+            computed = self._run_in_pool(_equity_batch_worker,
+                                         [(community_cards, [scenario for _, scenario in group], options)
+                                          for community_cards, group in tasks],
+                                         compute_locally, cancel_token)
+        else:
+            computed = compute_locally()
+        
+        for (_, group), group_results in zip(tasks, computed):
+            for (key, _), result in zip(group, group_results):
+                results[key] = result
+                if seed is None and result.samples > 0:
+                    self._cache_put(((key[0], key[1]), key[2], None), result)
+        return [results[key] for key in keys]
+    
+    def _board_group_equity(self, community_cards: List[int], scenarios: list, simulations: int = 20000,
+                            exact: Optional[bool] = None, target_std_error: Optional[float] = None,
+                            sampling: str = 'random',
+                            cancel_token: Optional[CancellationToken] = None) -> List[EquityResult]:
+        """
+        Equity de varios escenarios (my_cards, num_players, seed) con la misma mesa, sin caché
+        ni tabla preflop (ver calculate_equity_batch). Los que se calculan exactos comparten
+        una sola enumeración de la mesa (ver _enumerate_exact_board_group); el resto se simula
+        como en calculate_equity
+        """
+        results = [None] * len(scenarios)
+        shared = []
+        for index, (my_cards, num_players, seed) in enumerate(scenarios):
+            if len(my_cards) < 2 or num_players < 2:
+                results[index] = self.calculate_equity(my_cards, community_cards, num_players)
+            elif exact or (exact is None and self._prefer_exact(
+                    my_cards, community_cards, num_players, simulations, target_std_error,
+                    ADAPTIVE_MAX_SIMULATIONS, None)):
+                shared.append(index)
+            else:
+                result = EquityResult(0.0, [], 0, 0.0, False)
+                for result in self._iter_compute_equity(
+                        my_cards, community_cards, num_players, simulations, False, target_std_error,
+                        ADAPTIVE_MAX_SIMULATIONS, None, seed, cancel_token=cancel_token, sampling=sampling):
+                    pass
+                results[index] = result
+        
+        if len(shared) == 1:
+            # Un solo escenario: calculate_exact, que además puede usar el pool
+            my_cards, num_players, _ = scenarios[shared[0]]
+            results[shared[0]] = self.calculate_exact(my_cards, community_cards, num_players, cancel_token)
+        elif shared:
+            counts = _enumerate_exact_board_group(
+                self.evaluator, community_cards,
+                [(scenarios[index][0], scenarios[index][1] - 1) for index in shared], cancel_token)
+            for index, (wins, total, losing_hands) in zip(shared, counts):
+                if total == 0:
+                    results[index] = EquityResult(0.0, [], 0, 0.0, True)
+                else:
+                    results[index] = EquityResult(wins / total, self._top_losing_hands(losing_hands),
+                                                  total, 0.0, True)
+        return results
+    
+    def calculate_win_probability_within(self, my_cards: List[int], community_cards: List[int],
+                                         num_players: int, time_budget: float = 0.05) -> EquityResult:
+        """
+        Variante con límite de tiempo de calculate_win_probability: retorna la mejor
+        estimación alcanzable en time_budget segundos con su número de muestras y su error
+        """
+        return self.calculate_equity(my_cards, community_cards, num_players, time_budget=time_budget)
+    
+    def _top_losing_hands(self, losing_hands: Counter) -> List[Tuple[str, int]]:
+        """Las 3 manos (por tipo) que más veces me ganan, con su nombre"""
+        return [(self.HAND_NAMES.get(rank, "Desconocido"), count)
+                for rank, count in losing_hands.most_common(3)]
+    
+    def calculate_exact(self, my_cards: List[int], community_cards: List[int],
+                        num_players: int, cancel_token: Optional[CancellationToken] = None) -> EquityResult:
+        """
+        Enumera todas las cartas comunitarias por salir y todas las manos de los rivales
+        (descontando las cartas ya usadas) y retorna la equity exacta.
+        Con muchos repartos el trabajo se reparte entre los procesos del pool.
+        """
+        my_cards = cards_to_ints(my_cards)
+        community_cards = cards_to_ints(community_cards)
+        num_opponents = num_players - 1
+        available = self.get_available_cards(my_cards + community_cards)
+        needed_community = 5 - len(community_cards)
+        runouts = list(itertools.combinations(available, needed_community))
+        
+        deals = count_exact_deals(len(available), needed_community, num_opponents)
+        def enumerate_locally():
+            return [_enumerate_exact(self.evaluator, my_cards, community_cards, runouts, num_opponents,
+                                     cancel_token=cancel_token)]
+        
+        workers = process_pool_workers()
+        if (self.use_processes and workers > 1 and deals >= EXACT_PARALLEL_MIN_DEALS
+                and getattr(self.evaluator, 'name', None) in EVALUATOR_BACKENDS):
+            if len(runouts) >= workers * 4:
+                # Muchas mesas posibles: cada proceso recorre una parte de ellas
+                tasks = [(runouts[w::workers], 0, 1) for w in range(workers)]
+            else:
+                # River o turn: todos recorren las mismas mesas con distintas mejores manos
+                tasks = [(runouts, w, workers) for w in range(workers)]
+            parts = self._run_in_pool(_exact_enumeration_worker,
+                                      [(my_cards, community_cards, task_runouts, num_opponents, offset, step)
+                                       for task_runouts, offset, step in tasks],
+                                      enumerate_locally, cancel_token)
+        else:
+            parts = enumerate_locally()
+        
+        wins = sum(part[0] for part in parts)
+        total = sum(part[1] for part in parts)
+        losing_hands = Counter()
+        for part in parts:
+            losing_hands.update(part[2])
+        
+        if total == 0:
+            return EquityResult(0.0, [], 0, 0.0, True)
+        return EquityResult(wins / total, self._top_losing_hands(losing_hands), total, 0.0, True)
+    
+    def calculate_showdown(self, hands, community_cards=(), num_players: Optional[int] = None,
+                           exact: Optional[bool] = None, simulations: int = 20000,
+                           seed: Optional[int] = None,
+                           cancel_token: Optional[CancellationToken] = None) -> ShowdownResult:
+        """
+        Reparto del bote entre varios jugadores con las cartas de algunos conocidas.
+        hands tiene las 2 cartas de cada jugador o None si su mano es aleatoria; con
+        num_players se añaden jugadores con mano aleatoria hasta completar la mesa.
+        Si se conocen todas las manos se enumeran todas las mesas posibles (como mucho
+        C(48,5) = 1.712.304 preflop con 2 jugadores), evaluando una sola mesa de cada grupo
+        de mesas iguales salvo cambio de palos (ver suit_symmetries); si no (o con
+        exact=False) se simula. Retorna victorias, empates y parte del bote de cada jugador
+        """
+        hands = [None if hand is None else cards_to_ints(hand) for hand in hands]
+        if num_players is not None:
+            hands += [None] * (num_players - len(hands))
+        community_cards = cards_to_ints(community_cards)
+        known_hands = [hand for hand in hands if hand is not None]
+        known_cards = community_cards + [card for hand in known_hands for card in hand]
+        if any(len(hand) != 2 for hand in known_hands) or len(community_cards) > 5:
+            raise ValueError("Cada mano debe tener 2 cartas y la mesa como mucho 5")
+        if len(set(known_cards)) != len(known_cards):
+            raise ValueError("Hay cartas repetidas entre las manos y la mesa")
+        if len(hands) < 2:
+            raise ValueError("Hacen falta al menos 2 jugadores")
+        all_known = len(known_hands) == len(hands)
+        if exact and not all_known:
+            raise ValueError("El cálculo exacto necesita las cartas de todos los jugadores")
+        
+        if exact is None:
+            exact = all_known
+        if exact:
+            wins, ties, shares, total = self._enumerate_showdown_parts(hands, community_cards, cancel_token)
+            squares = None
+        else:
+            wins, ties, shares, squares, total = self._simulate_showdown(
+                hands, community_cards, simulations, seed, cancel_token)
+        
+        seats = []
+        for seat, hand in enumerate(hands):
+            if total == 0:
+                seats.append(SeatEquity(tuple(hand or ()), 0.0, 0.0, 0.0, 0.0))
+                continue
+            equity = shares[seat] / total
+            std_error = 0.0
+            if squares is not None and total > 1:
+                variance = max(squares[seat] / total - equity * equity, 0.0)
+                std_error = math.sqrt(variance / (total - 1))
+            seats.append(SeatEquity(tuple(hand or ()), wins[seat] / total, ties[seat] / total,
+                                    equity, std_error))
+        return ShowdownResult(seats, total, exact)
+    
+    def _enumerate_showdown_parts(self, hands: List[List[int]], community_cards: List[int],
+                                  cancel_token: Optional[CancellationToken] = None) -> Tuple[list, list, list, int]:
+        """Enumeración de calculate_showdown, repartida entre los procesos del pool si compensa"""
+        symmetries = suit_symmetries(hands + [community_cards])
+        needed_community = 5 - len(community_cards)
+        deck_size = 52 - len(community_cards) - 2 * len(hands)
+        deals = math.comb(deck_size, needed_community) * len(hands)
+        def enumerate_locally():
+            return [_enumerate_showdown(self.evaluator, hands, community_cards, symmetries=symmetries,
+                                        cancel_token=cancel_token)]
+        
+        workers = process_pool_workers()
+        if (self.use_processes and workers > 1 and deals >= EXACT_PARALLEL_MIN_DEALS
+                and getattr(self.evaluator, 'name', None) in EVALUATOR_BACKENDS):
+            parts = self._run_in_pool(_showdown_enumeration_worker,
+                                      [(hands, community_cards, w, workers, symmetries) for w in range(workers)],
+                                      enumerate_locally, cancel_token)
+        else:
+            parts = enumerate_locally()
+        
+        num_seats = len(hands)
+        wins = [sum(part[0][seat] for part in parts) for seat in range(num_seats)]
+        ties = [sum(part[1][seat] for part in parts) for seat in range(num_seats)]
+        shares = [sum(part[2][seat] for part in parts) for seat in range(num_seats)]
+        return wins, ties, shares, sum(part[3] for part in parts)
+    
+    def _simulate_showdown(self, hands: List[Optional[List[int]]], community_cards: List[int],
+                           simulations: int, seed: Optional[int] = None,
+                           cancel_token: Optional[CancellationToken] = None):
+        """
+        Simulación de calculate_showdown: mesa y manos aleatorias con Fisher-Yates parcial
+        Retorna: (victorias, empates, parte del bote, Σ parte², simulaciones)
+        """
+        rng = random if seed is None else random.Random(seed)
+        random_float = rng.random
+        board_state = self.evaluator.board_state
+        board_flush_possible = self.evaluator.board_flush_possible
+        evaluate_with_board = self.evaluator.evaluate_with_board
+        evaluate_ranks_with_board = self.evaluator.evaluate_ranks_with_board
+        flush_possible = self.flush_possible(community_cards)
+        
+        known_cards = community_cards + [card for hand in hands if hand is not None for card in hand]
+        deck = self.get_available_cards(known_cards)
+        deck_size = len(deck)
+        needed_community = 5 - len(community_cards)
+        random_seats = [seat for seat, hand in enumerate(hands) if hand is None]
+        total_needed = needed_community + 2 * len(random_seats)
+        num_seats = len(hands)
+        wins = [0] * num_seats
+        ties = [0] * num_seats
+        shares = [0.0] * num_seats
+        squares = [0.0] * num_seats
+        if deck_size < total_needed or simulations <= 0:
+            return wins, ties, shares, squares, 0
+        
+        seat_cards = [hand or [0, 0] for hand in hands]
+        for chunk_start in range(0, simulations, CANCEL_CHECK_INTERVAL):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            for _ in range(min(CANCEL_CHECK_INTERVAL, simulations - chunk_start)):
+                # Fisher-Yates parcial: mesa en deck[:needed_community] y manos aleatorias a continuación
+                for i in range(total_needed):
+                    j = i + int(random_float() * (deck_size - i))
+                    deck[i], deck[j] = deck[j], deck[i]
+                for index, seat in enumerate(random_seats):
+                    i = needed_community + 2 * index
+                    seat_cards[seat] = deck[i:i + 2]
                 
-                # Encontrar la mejor mano del oponente
-                if best_opponent_evaluation is None:
-                    best_opponent_evaluation = other_evaluation
-                    best_opponent_rank = other_rank
+                board = board_state(community_cards + deck[:needed_community], flush_possible)
+                if flush_possible and board_flush_possible(board):
+                    evaluate = evaluate_with_board
                 else:
-                    # Comparar con la mejor mano encontrada hasta ahora
-                    comp = PokerHandEvaluator.compare_hands(best_opponent_evaluation, other_evaluation)
-                    if comp < 0:  # Esta mano del oponente es mejor
-                        best_opponent_evaluation = other_evaluation
-                        best_opponent_rank = other_rank
-            
-            # Comparar mi mano con la mejor mano de todos los oponentes
-            if best_opponent_evaluation is not None:
-                comparison = PokerHandEvaluator.compare_hands(my_evaluation, best_opponent_evaluation)
+                    evaluate = evaluate_ranks_with_board
+                _award_pot([evaluate(board, cards[0], cards[1]) for cards in seat_cards], 1,
+                           wins, ties, shares, squares)
+        
+        return wins, ties, shares, squares, simulations
+    
+    def estimate_losing_hands(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                              simulations: int = 20000, importance: bool = True,
+                              seed: Optional[int] = None,
+                              cancel_token: Optional[CancellationToken] = None) -> LosingHandsResult:
+        """
+        Estima con qué probabilidad me gana cada tipo de mano, también los poco frecuentes
+        (poker, escalera de color) que la simulación normal apenas ve.
+        Con importance=True (muestreo por importancia) parte de los repartos se sortean con
+        más peso para las cartas que emparejan la mesa, comparten su palo o pueden hacer
+        escalera de color con ella (ver IMPORTANCE_*), y cada reparto cuenta con su cociente
+        de verosimilitudes respecto a esa mezcla (como mucho 1 / IMPORTANCE_UNIFORM_FRACTION).
+        Las frecuencias son medias ponderadas autonormalizadas con su error estándar (método
+        delta) y effective_samples es el tamaño efectivo de la muestra, (Σ pesos)² / Σ pesos².
+        Con importance=False es una simulación normal (todos los pesos 1), útil para comparar.
+        Retorna las frecuencias de mayor a menor
+        """
+        my_cards = cards_to_ints(my_cards)
+        community_cards = cards_to_ints(community_cards)
+        rng = random if seed is None else random.Random(seed)
+        random_float = rng.random
+        accumulate = itertools.accumulate
+        bisect_right = bisect.bisect_right
+        
+        board_state = self.evaluator.board_state
+        board_flush_possible = self.evaluator.board_flush_possible
+        evaluate_with_board = self.evaluator.evaluate_with_board
+        evaluate_ranks_with_board = self.evaluator.evaluate_ranks_with_board
+        category_shift = PokerHandEvaluator.CATEGORY_SHIFT
+        flush_possible = self.flush_possible(community_cards)
+        
+        known_cards = my_cards + community_cards
+        deck = self.get_available_cards(known_cards)
+        deck_size = len(deck)
+        needed_community = 5 - len(community_cards)
+        total_needed = (num_players - 1) * 2 + needed_community
+        if num_players < 2 or deck_size < total_needed or simulations <= 0:
+            return LosingHandsResult([], 1.0 if num_players < 2 else 0.0, 0, 0.0)
+        
+        rank_boost = IMPORTANCE_RANK_BOOST
+        suit_boost = IMPORTANCE_SUIT_BOOST
+        straight_flush_boost = IMPORTANCE_STRAIGHT_FLUSH_BOOST
+        uniform_fraction = IMPORTANCE_UNIFORM_FRACTION
+        
+        def add_board_card(weights, available, card) -> float:
+            """Suma a cada carta el peso extra que le da card en la mesa; retorna lo sumado a las disponibles"""
+            rank, suit = card >> 2, card & 3
+            added = 0.0
+            for other in range(rank * 4, rank * 4 + 4):
+                weights[other] += rank_boost
+                if available[other]:
+                    added += rank_boost
+            for other in range(suit, 52, 4):
+                weights[other] += suit_boost
+                if available[other]:
+                    added += suit_boost
+            for other in range(max(rank - 4, 0) * 4 + suit, min(rank + 4, 12) * 4 + suit + 1, 4):
+                weights[other] += straight_flush_boost
+                if available[other]:
+                    added += straight_flush_boost
+            return added
+        
+        base_weights = [1.0] * 52
+        base_available = [False] * 52
+        for card in deck:
+            base_available[card] = True
+        for card in community_cards:
+            add_board_card(base_weights, base_available, card)
+        base_total = sum(base_weights[card] for card in deck)
+        
+        all_community = community_cards + [0] * needed_community
+        known_community = len(community_cards)
+        my_card1, my_card2 = my_cards[0], my_cards[1]
+        weight_sum = 0.0
+        weight_sq_sum = 0.0
+        win_sum = 0.0
+        loss_sums = [0.0] * 11  # Por tipo de mano que me gana: Σ pesos
+        loss_sq_sums = [0.0] * 11  # y Σ pesos²
+        ratio = 1.0
+        
+        for chunk_start in range(0, simulations, CANCEL_CHECK_INTERVAL):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            for _ in range(min(CANCEL_CHECK_INTERVAL, simulations - chunk_start)):
+                # Mezcla defensiva: una parte de los repartos sale uniforme y el resto con pesos
+                boosted = importance and random_float() >= uniform_fraction
+                remaining = deck[:]
+                size = deck_size
+                dealt = []
+                if importance:
+                    weights = base_weights[:]
+                    available = base_available[:]
+                    total = base_total
+                    likelihood = 1.0  # Probabilidad del reparto con pesos / uniforme
+                for i in range(total_needed):
+                    if boosted:
+                        # Sorteo proporcional al peso de cada carta que queda
+                        cumulative = list(accumulate([weights[card] for card in remaining]))
+                        index = bisect_right(cumulative, random_float() * cumulative[-1], 0, size - 1)
+                    else:
+                        index = int(random_float() * size)
+                    card = remaining.pop(index)
+                    if importance:
+                        weight = weights[card]
+                        likelihood *= size * weight / total
+                        total -= weight
+                        available[card] = False
+                        if i < needed_community:
+                            total += add_board_card(weights, available, card)
+                    size -= 1
+                    if i < needed_community:
+                        all_community[known_community + i] = card
+                    else:
+                        dealt.append(card)
+                if importance:
+                    # Cociente de verosimilitudes respecto a la mezcla: como mucho 1 / uniform_fraction
+                    ratio = 1.0 / (uniform_fraction + (1.0 - uniform_fraction) * likelihood)
                 
-                # Si la mejor mano del oponente es MEJOR que la mía, pierdo
-                if comparison < 0:
-                    best_opponent_hand = hand_names.get(best_opponent_rank, "Desconocido")
-                    losing_hands[best_opponent_hand] += 1
+                board = board_state(all_community, flush_possible)
+                if flush_possible and board_flush_possible(board):
+                    evaluate = evaluate_with_board
                 else:
-                    # Gano o empato (comparison >= 0)
-                    wins += 1
+                    evaluate = evaluate_ranks_with_board
+                
+                my_strength = evaluate(board, my_card1, my_card2)
+                best_opponent_strength = 0
+                for i in range(0, len(dealt), 2):
+                    strength = evaluate(board, dealt[i], dealt[i + 1])
+                    if strength > best_opponent_strength:
+                        best_opponent_strength = strength
+                
+                ratio_sq = ratio * ratio
+                weight_sum += ratio
+                weight_sq_sum += ratio_sq
+                if best_opponent_strength > my_strength:
+                    category = best_opponent_strength >> category_shift
+                    loss_sums[category] += ratio
+                    loss_sq_sums[category] += ratio_sq
+                else:
+                    win_sum += ratio
+        
+        def std_error(estimate, sq_sum):
+            # Método delta: Σ w²(I - p)² / (Σ w)², con I = 1 en los repartos del suceso
+            variance = sq_sum * (1 - 2 * estimate) + estimate * estimate * weight_sq_sum
+            return math.sqrt(max(variance, 0.0)) / weight_sum
+        
+        frequencies = []
+        for category in range(10, 0, -1):
+            if loss_sums[category] > 0:
+                estimate = loss_sums[category] / weight_sum
+                frequencies.append((self.HAND_NAMES.get(category, "Desconocido"), estimate,
+                                    std_error(estimate, loss_sq_sums[category])))
+        frequencies.sort(key=lambda item: item[1], reverse=True)
+        return LosingHandsResult(frequencies, win_sum / weight_sum, simulations,
+                                 weight_sum * weight_sum / weight_sq_sum)
+    
+    def simulate(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                 simulations: int = 20000, target_std_error: Optional[float] = None,
+                 batch_size: int = SIMULATION_BATCH_SIZE,
+                 time_budget: Optional[float] = None,
+                 seed: Optional[int] = None,
+                 opponent_ranges: Optional[list] = None,
+                 cancel_token: Optional[CancellationToken] = None,
+                 sampling: str = 'random') -> EquityResult:
+        """Calcula la probabilidad de ganar usando simulación Monte Carlo (ver iter_simulation)"""
+        result = EquityResult(0.0, [], 0, 0.0, False)
+        for result in self.iter_simulation(my_cards, community_cards, num_players, simulations,
+                                           target_std_error, batch_size, time_budget, seed,
+                                           opponent_ranges, cancel_token, sampling):
+            pass
+        return result
+    
+    def iter_simulation(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                        simulations: int = 20000, target_std_error: Optional[float] = None,
+                        batch_size: int = SIMULATION_BATCH_SIZE,
+                        time_budget: Optional[float] = None,
+                        seed: Optional[int] = None,
+                        opponent_ranges: Optional[list] = None,
+                        cancel_token: Optional[CancellationToken] = None,
+                        sampling: str = 'random'):
+        """
+        Simulación Monte Carlo por lotes de batch_size: tras cada lote produce el
+        EquityResult acumulado. Sin target_std_error ni time_budget se hacen exactamente
+        `simulations` simulaciones. Con target_std_error se para en cuanto el error
+        estándar llega al objetivo. Con time_budget (segundos) se para antes de pasarse del
+        tiempo: el tamaño de cada lote se ajusta a la velocidad medida en los anteriores.
+        En ambos casos `simulations` es el máximo.
+        Con varios núcleos cada lote es de batch_size × procesos (para amortizar el envío de
+        tareas) y se reparte entre los procesos del pool, cada uno con su propio generador;
+        seed hace el resultado reproducible.
+        opponent_ranges: rango de manos de cada oponente (HandRange, lista o diccionario de
+        clases de mano, o None para mano aleatoria)
+        cancel_token: CancellationToken; si se cancela, lanza CalculationCancelled
+        sampling: 'random' baraja al azar en cada simulación. 'stratified' (hipercubo latino)
+        y 'qmc' (sucesión de Halton con desplazamiento aleatorio) reparten los repartos de
+        forma más uniforme y alcanzan el mismo error con menos simulaciones; se simula por
+        bloques independientes y el error estándar sale de la varianza entre bloques. Con
+        rangos de oponentes siempre se usa 'random'.
+        """
+        if sampling not in SAMPLING_BLOCK_SIZES:
+            raise ValueError(f"Muestreo desconocido: {sampling} (disponibles: {', '.join(SAMPLING_BLOCK_SIZES)})")
+        my_cards = cards_to_ints(my_cards)
+        community_cards = cards_to_ints(community_cards)
+        opponent_ranges = self._normalize_ranges(opponent_ranges, num_players - 1, my_cards + community_cards)
+        if opponent_ranges:
+            sampling = 'random'
+        block_size = SAMPLING_BLOCK_SIZES[sampling]
+        
+        rng = random if seed is None else random.Random(seed)
+        workers = self._simulation_workers(simulations)
+        if time_budget is not None and workers > 1 and not process_pool_ready():
+            # Arrancar el pool no cabe en el límite de tiempo: se calcula en este proceso
+            # mientras otro thread arranca el pool para los siguientes cálculos
+            if not _POOL_WARMUP:
+                threading.Thread(target=warm_process_pool, args=(self.evaluator.name,), daemon=True).start()
+            workers = 1
+        if workers > 1:
+            # Lotes proporcionales al número de procesos para amortizar el envío de tareas
+            batch_size *= workers
+            if seed is None:
+                seed = random.getrandbits(64)
+        
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        wins = 0
+        block_sq_sum = 0  # Suma de (victorias de cada bloque)², para el error entre bloques
+        done = 0
+        batch_index = 0
+        losing_hands = Counter()  # Contador de tipos de mano que me ganan
+        while done < simulations:
+            count = min(simulations - done, batch_size)
+            batch_workers = workers
+            if deadline is not None:
+                if done == 0:
+                    # Primer lote pequeño, en este proceso, para medir la velocidad
+                    count = min(count, DEADLINE_PROBE_SIMULATIONS)
+                    batch_workers = 1
+                else:
+                    # Cada lote debe terminar antes del límite: un lote enviado al pool ya no se
+                    # puede parar, así que se cuenta su tiempo esperado (con el coste del envío)
+                    remaining_time = deadline - time.perf_counter()
+                    if batch_workers > 1:
+                        overhead = 0.0 if self.pool_hands_per_second else POOL_BATCH_SECONDS
+                        fitting = ((remaining_time - overhead)
+                                   / self.simulation_seconds(1, num_players, batch_workers))
+                        if fitting < batch_workers * block_size:
+                            # No cabe un lote útil en el pool: el resto en este proceso
+                            batch_workers = 1
+                    if batch_workers == 1:
+                        fitting = remaining_time / self.simulation_seconds(1, num_players)
+                    count = min(count, int(fitting) // block_size * block_size)
+                    if count <= 0:
+                        break
+            # Solo bloques completos (puede pasarse de `simulations` en menos de un bloque)
+            count = (count + block_size - 1) // block_size * block_size
+            batch_start = time.perf_counter()
+            batch_wins, batch_losing, batch_sq_sum = self._run_batch(
+                my_cards, community_cards, num_players, count, rng, batch_workers, seed, batch_index,
+                opponent_ranges, cancel_token, sampling)
+            # Velocidad medida, para las estimaciones de tiempo (ver simulation_seconds)
+            hands_per_second = (count * (num_players + SIMULATION_OVERHEAD_HANDS)
+                                / max(time.perf_counter() - batch_start, 1e-6))
+            if batch_workers > 1:
+                self.pool_hands_per_second = hands_per_second
+            elif count >= DEADLINE_PROBE_SIMULATIONS:
+                self.simulation_hands_per_second = hands_per_second
+            wins += batch_wins
+            block_sq_sum += batch_sq_sum
+            losing_hands.update(batch_losing)
+            done += count
+            batch_index += 1
+            if block_size > 1 and done >= MIN_ERROR_BLOCKS * block_size and 0 < wins < done:
+                std_error = block_std_error(wins, done, block_sq_sum, block_size)
             else:
-                # No hay oponentes (no debería pasar, pero por seguridad)
-                wins += 1
+                std_error = binomial_std_error(wins, done)
+            yield EquityResult(wins / done, self._top_losing_hands(losing_hands), done, std_error, False)
+            if target_std_error is not None and std_error <= target_std_error:
+                break
+    
+    def _run_in_pool(self, worker, tasks: list, compute_locally, cancel_token=None) -> list:
+        """
+        Envía worker(evaluador, *tarea, señal de cancelación) al pool para cada tarea y
+        retorna sus resultados en orden. Si el pool no se puede usar, deja de usar procesos
+        y retorna compute_locally()
+        """
+        try:
+            pool = get_process_pool()
+            cancel_flag = _pool_cancel_flag(cancel_token)
+            futures = [pool.submit(worker, self.evaluator.name, *task, cancel_flag) for task in tasks]
+            return _collect_results(futures, cancel_token)
+        except (OSError, RuntimeError) as e:
+            print(f"No se pudo usar el pool de procesos ({e}); se calcula en este proceso")
+            self.use_processes = False
+        return compute_locally()
+    
+    def _simulation_workers(self, simulations: int) -> int:
+        """Procesos entre los que repartir la simulación (1 = en este proceso)"""
+        if (not self.use_processes or simulations < PARALLEL_MIN_SIMULATIONS
+                or getattr(self.evaluator, 'name', None) not in EVALUATOR_BACKENDS):
+            return 1
+        return process_pool_workers()
+    
+    def _run_batch(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                   count: int, rng, workers: int, seed: Optional[int],
+                   batch_index: int, opponent_ranges=None,
+                   cancel_token: Optional[CancellationToken] = None,
+                   sampling: str = 'random') -> Tuple[int, Counter, int]:
+        """
+        Ejecuta un lote de simulaciones: repartido entre los procesos del pool (cada uno con
+        la semilla derivada de (seed, lote, proceso)) o en este proceso con rng.
+        count debe ser múltiplo del tamaño de bloque de sampling; cada proceso recibe bloques completos
+        """
+        def run_locally():
+            return [self._run_sampled_batch(my_cards, community_cards, num_players, count, rng,
+                                            opponent_ranges, sampling, cancel_token)]
+        
+        block_size = SAMPLING_BLOCK_SIZES[sampling]
+        if workers > 1 and count >= workers * block_size:
+            blocks = count // block_size
+            counts = [(blocks // workers + (1 if i < blocks % workers else 0)) * block_size
+                      for i in range(workers)]
+            parts = self._run_in_pool(_simulation_worker,
+                                      [(my_cards, community_cards, num_players, worker_count,
+                                        derive_seed(seed, batch_index, i), opponent_ranges, sampling)
+                                       for i, worker_count in enumerate(counts)],
+                                      run_locally, cancel_token)
+        else:
+            parts = run_locally()
+        if len(parts) == 1:
+            return parts[0]
+        wins = 0
+        block_sq_sum = 0
+        losing_hands = Counter()
+        for part_wins, part_losing, part_sq_sum in parts:
+            wins += part_wins
+            block_sq_sum += part_sq_sum
+            losing_hands.update(part_losing)
+        return wins, losing_hands, block_sq_sum
+    
+    def _run_sampled_batch(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                           simulations: int, rng=random, opponent_ranges=None, sampling: str = 'random',
+                           cancel_token: Optional[CancellationToken] = None) -> Tuple[int, Counter, int]:
+        """
+        Un lote de simulaciones en este proceso con el muestreo indicado
+        Retorna: (victorias, Counter(tipo de mano -> veces que me gana), suma de (victorias de cada bloque)²)
+        """
+        if sampling == 'random':
+            wins, losing_hands = self._run_simulations(my_cards, community_cards, num_players, simulations,
+                                                       rng, opponent_ranges, cancel_token)
+            # Bloques de una simulación: victorias² = victorias
+            return wins, losing_hands, wins
+        return self._run_block_simulations(my_cards, community_cards, num_players, simulations, rng,
+                                           sampling, cancel_token)
+    
+    @staticmethod
+    def _normalize_ranges(opponent_ranges, num_opponents: int,
+                          known_cards: List[int] = ()) -> Optional[List[Optional[HandRange]]]:
+        """
+        Convierte los rangos a HandRange (None = mano aleatoria) y completa con None hasta
+        num_opponents. Retorna None si ningún oponente tiene rango.
+        Lanza ValueError si un rango no tiene ninguna combinación sin las cartas conocidas
+        """
+        if not opponent_ranges:
+            return None
+        ranges = [HandRange.from_value(value) for value in opponent_ranges]
+        if len(ranges) > num_opponents:
+            raise ValueError(f"Hay {len(ranges)} rangos para {num_opponents} oponentes")
+        if all(hand_range is None for hand_range in ranges):
+            return None
+        dead_mask = cards_to_bitboard(known_cards)
+        for hand_range in ranges:
+            if hand_range is not None and all(CARD_BITS[card1] & dead_mask or CARD_BITS[card2] & dead_mask
+                                              for card1, card2 in hand_range.weights):
+                raise ValueError("Un rango de oponente no tiene combinaciones posibles con las cartas conocidas")
+        return ranges + [None] * (num_opponents - len(ranges))
+    
+    def _run_simulations(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                         simulations: int, rng=random, opponent_ranges=None,
+                         cancel_token: Optional[CancellationToken] = None) -> Tuple[int, Counter]:
+        """
+        Ejecuta un lote de simulaciones Monte Carlo con el generador rng
+        (por defecto el del módulo random)
+        Retorna: (simulaciones ganadas o empatadas, Counter(tipo de mano -> veces que me gana))
+        """
+        if opponent_ranges:
+            return self._run_range_simulations(my_cards, community_cards, num_players, simulations,
+                                               rng, opponent_ranges, cancel_token)
+        known_cards = my_cards + community_cards
+        wins = 0
+        losing_hands = Counter()  # Contador de tipos de mano que me ganan
+        
+        board_state = self.evaluator.board_state
+        board_flush_possible = self.evaluator.board_flush_possible
+        evaluate_with_board = self.evaluator.evaluate_with_board
+        evaluate_ranks_with_board = self.evaluator.evaluate_ranks_with_board
+        category_shift = PokerHandEvaluator.CATEGORY_SHIFT
+        
+        # Si las cartas comunitarias conocidas ya impiden cualquier color, no mirar palos
+        flush_possible = self.flush_possible(community_cards)
+        
+        # Mazo reutilizado entre simulaciones: en cada una solo se barajan (Fisher-Yates
+        # parcial) las posiciones que se van a usar. Partir de la permutación anterior no
+        # cambia nada: el prefijo barajado es uniforme sea cual sea el orden de partida
+        deck = self.get_available_cards(known_cards)
+        deck_size = len(deck)
+        needed_community = 5 - len(community_cards)
+        total_needed = (num_players - 1) * 2 + needed_community
+        if deck_size < total_needed:
+            # No hay cartas suficientes para repartir: ninguna simulación cuenta como ganada
+            return wins, losing_hands
+        
+        # Mesa reutilizada: las cartas conocidas fijas y los huecos de las que faltan
+        all_community = community_cards + [0] * needed_community
+        known_community = len(community_cards)
+        my_card1, my_card2 = my_cards[0], my_cards[1]
+        random_float = rng.random
+        
+        for chunk_start in range(0, simulations, CANCEL_CHECK_INTERVAL):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            for _ in range(min(CANCEL_CHECK_INTERVAL, simulations - chunk_start)):
+                # Fisher-Yates parcial: deck[:total_needed] queda con cartas al azar
+                for i in range(total_needed):
+                    j = i + int(random_float() * (deck_size - i))
+                    deck[i], deck[j] = deck[j], deck[i]
+                
+                # Las primeras cartas completan la mesa; el resto son las de los oponentes
+                for i in range(needed_community):
+                    all_community[known_community + i] = deck[i]
+                
+                # La mesa se precalcula una vez y se comparte entre todos los jugadores
+                board = board_state(all_community, flush_possible)
+                # Con menos de 3 cartas de cada palo en la mesa nadie puede hacer color
+                if flush_possible and board_flush_possible(board):
+                    evaluate = evaluate_with_board
+                else:
+                    evaluate = evaluate_ranks_with_board
+                
+                # Evaluar mi mano (fuerza entera: mayor = mejor)
+                my_strength = evaluate(board, my_card1, my_card2)
+                
+                # La mejor mano entre todos los oponentes es el máximo de sus fuerzas
+                best_opponent_strength = 0
+                for i in range(needed_community, total_needed, 2):
+                    strength = evaluate(board, deck[i], deck[i + 1])
+                    if strength > best_opponent_strength:
+                        best_opponent_strength = strength
+                
+                # Si la mejor mano del oponente es MEJOR que la mía, pierdo (sin oponentes, gano)
+                if best_opponent_strength > my_strength:
+                    losing_hands[best_opponent_strength >> category_shift] += 1
+                else:
+                    # Gano o empato
+                    wins += 1
+        
+        return wins, losing_hands
+    
+    @staticmethod
+    def _sample_block(sampling: str, block_size: int, dimensions: int, rng) -> list:
+        """
+        Un bloque de block_size puntos de [0, 1)^dimensions, uniforme en conjunto:
+        'stratified': hipercubo latino; en cada coordenada hay exactamente un punto en cada
+        uno de los block_size intervalos iguales, emparejados al azar entre coordenadas
+        'qmc': puntos de Halton desplazados módulo 1 por un vector aleatorio (Cranley-Patterson)
+        """
+        random_float = rng.random
+        if sampling == 'qmc':
+            shift = [random_float() for _ in range(dimensions)]
+            return [[(value + offset) % 1.0 for value, offset in zip(point, shift)]
+                    for point in halton_points(block_size, dimensions)]
+        # Escalar por LARGEST_UNIT_FLOAT / block_size (block_size potencia de 2) garantiza < 1
+        scale = LARGEST_UNIT_FLOAT / block_size
+        strata = range(block_size)
+        columns = [[(stratum + random_float()) * scale for stratum in strata]]
+        for _ in range(1, dimensions):
+            # Orden aleatorio de los estratos: ordenar por claves aleatorias es más rápido que shuffle
+            keys = [random_float() for _ in strata]
+            columns.append([(stratum + random_float()) * scale
+                            for stratum in sorted(strata, key=keys.__getitem__)])
+        return list(zip(*columns))
+    
+    def _run_block_simulations(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                               simulations: int, rng, sampling: str,
+                               cancel_token: Optional[CancellationToken] = None) -> Tuple[int, Counter, int]:
+        """
+        Como _run_simulations, pero cada reparto sale de un punto de un bloque estratificado
+        o cuasi-aleatorio (ver _sample_block): la coordenada i elige la siguiente carta por
+        su posición entre las que quedan, ordenadas por rango. Así los puntos bien repartidos
+        dan cartas altas y bajas en la proporción justa. simulations es múltiplo del bloque
+        Retorna: (victorias, Counter(tipo de mano -> veces que me gana), suma de (victorias de cada bloque)²)
+        """
+        wins = 0
+        block_sq_sum = 0
+        losing_hands = Counter()
+        
+        board_state = self.evaluator.board_state
+        board_flush_possible = self.evaluator.board_flush_possible
+        evaluate_with_board = self.evaluator.evaluate_with_board
+        evaluate_ranks_with_board = self.evaluator.evaluate_ranks_with_board
+        category_shift = PokerHandEvaluator.CATEGORY_SHIFT
+        flush_possible = self.flush_possible(community_cards)
+        
+        known_cards = my_cards + community_cards
+        deck = sorted(self.get_available_cards(known_cards))
+        deck_size = len(deck)
+        needed_community = 5 - len(community_cards)
+        total_needed = (num_players - 1) * 2 + needed_community
+        if deck_size < total_needed:
+            return wins, losing_hands, block_sq_sum
+        
+        all_community = community_cards + [0] * needed_community
+        known_community = len(community_cards)
+        my_card1, my_card2 = my_cards[0], my_cards[1]
+        block_size = SAMPLING_BLOCK_SIZES[sampling]
+        
+        for _ in range(simulations // block_size):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            block_wins = 0
+            for point in self._sample_block(sampling, block_size, total_needed, rng):
+                remaining = deck[:]
+                size = deck_size
+                for i in range(needed_community):
+                    all_community[known_community + i] = remaining.pop(int(point[i] * size))
+                    size -= 1
+                
+                board = board_state(all_community, flush_possible)
+                if flush_possible and board_flush_possible(board):
+                    evaluate = evaluate_with_board
+                else:
+                    evaluate = evaluate_ranks_with_board
+                
+                my_strength = evaluate(board, my_card1, my_card2)
+                best_opponent_strength = 0
+                for i in range(needed_community, total_needed, 2):
+                    card1 = remaining.pop(int(point[i] * size))
+                    card2 = remaining.pop(int(point[i + 1] * (size - 1)))
+                    size -= 2
+                    strength = evaluate(board, card1, card2)
+                    if strength > best_opponent_strength:
+                        best_opponent_strength = strength
+                
+                if best_opponent_strength > my_strength:
+                    losing_hands[best_opponent_strength >> category_shift] += 1
+                else:
+                    block_wins += 1
+            wins += block_wins
+            block_sq_sum += block_wins * block_wins
+        
+        return wins, losing_hands, block_sq_sum
+    
+    def _run_range_simulations(self, my_cards: List[int], community_cards: List[int], num_players: int,
+                               simulations: int, rng, opponent_ranges: List[Optional[HandRange]],
+                               cancel_token: Optional[CancellationToken] = None) -> Tuple[int, Counter]:
+        """
+        Como _run_simulations, pero los oponentes con rango reciben una combinación de su
+        rango (tabla alias sin las cartas conocidas). Si dos de ellas chocan se vuelven a
+        sortear todas, así la distribución conjunta es exacta; la mesa y los oponentes sin
+        rango salen del resto del mazo
+        """
+        wins = 0
+        losing_hands = Counter()
         
-        # Obtener las 3 manos más frecuentes que me ganan
-        top_losing_hands = losing_hands.most_common(3)
+        board_state = self.evaluator.board_state
+        board_flush_possible = self.evaluator.board_flush_possible
+        evaluate_with_board = self.evaluator.evaluate_with_board
+        evaluate_ranks_with_board = self.evaluator.evaluate_ranks_with_board
+        category_shift = PokerHandEvaluator.CATEGORY_SHIFT
+        flush_possible = self.flush_possible(community_cards)
+        
+        known_cards = my_cards + community_cards
+        dead_mask = cards_to_bitboard(known_cards)
+        # _normalize_ranges ya comprobó que cada rango tiene combinaciones posibles
+        samplers = [hand_range.sampler(dead_mask) if hand_range is not None else None
+                    for hand_range in opponent_ranges]
+        range_samplers = [sampler for sampler in samplers if sampler is not None]
+        random_opponents = len(samplers) - len(range_samplers)
+        
+        deck = self.get_available_cards(known_cards)
+        deck_size = len(deck)
+        # Posición de cada carta en el mazo, para sacar del sorteo las cartas de los rangos
+        position = [0] * 52
+        for index, card in enumerate(deck):
+            position[card] = index
+        needed_community = 5 - len(community_cards)
+        total_needed = needed_community + 2 * random_opponents
+        if deck_size - 2 * len(range_samplers) < total_needed:
+            return wins, losing_hands
+        
+        all_community = community_cards + [0] * needed_community
+        known_community = len(community_cards)
+        my_card1, my_card2 = my_cards[0], my_cards[1]
+        random_float = rng.random
+        
+        for chunk_start in range(0, simulations, CANCEL_CHECK_INTERVAL):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            for _ in range(min(CANCEL_CHECK_INTERVAL, simulations - chunk_start)):
+                # Manos de los oponentes con rango: sin choques entre ellas
+                for _ in range(MAX_RANGE_ATTEMPTS):
+                    used_mask = 0
+                    holdings = []
+                    for sampler in range_samplers:
+                        mask, card1, card2 = sampler.sample(random_float)
+                        if mask & used_mask:
+                            break
+                        used_mask |= mask
+                        holdings.append((card1, card2))
+                    else:
+                        break
+                else:
+                    raise ValueError("Los rangos de los oponentes no son compatibles entre sí")
+                
+                # Llevar sus cartas al final del mazo: el sorteo usa solo deck[:tail]
+                tail = deck_size
+                for holding in holdings:
+                    for card in holding:
+                        tail -= 1
+                        index = position[card]
+                        other = deck[tail]
+                        deck[index] = other
+                        deck[tail] = card
+                        position[other] = index
+                        position[card] = tail
+                
+                # Fisher-Yates parcial sobre el resto del mazo
+                for i in range(total_needed):
+                    j = i + int(random_float() * (tail - i))
+                    card_i = deck[i]
+                    card_j = deck[j]
+                    deck[i] = card_j
+                    deck[j] = card_i
+                    position[card_j] = i
+                    position[card_i] = j
+                
+                for i in range(needed_community):
+                    all_community[known_community + i] = deck[i]
+                
+                board = board_state(all_community, flush_possible)
+                if flush_possible and board_flush_possible(board):
+                    evaluate = evaluate_with_board
+                else:
+                    evaluate = evaluate_ranks_with_board
+                
+                my_strength = evaluate(board, my_card1, my_card2)
+                best_opponent_strength = 0
+                for card1, card2 in holdings:
+                    strength = evaluate(board, card1, card2)
+                    if strength > best_opponent_strength:
+                        best_opponent_strength = strength
+                for i in range(needed_community, total_needed, 2):
+                    strength = evaluate(board, deck[i], deck[i + 1])
+                    if strength > best_opponent_strength:
+                        best_opponent_strength = strength
+                
+                if best_opponent_strength > my_strength:
+                    losing_hands[best_opponent_strength >> category_shift] += 1
+                else:
+                    wins += 1
         
-        return (wins / simulations, top_losing_hands)
+        return wins, losing_hands
 
 
 class PreflopStrategy:
@@ -432,7 +3563,8 @@ class PreflopStrategy:
         
         return table
     
-    def normalize_hand(self, card1: str, card2: str) -> str:
+    @staticmethod
+    def normalize_hand(card1: str, card2: str) -> str:
         """Normaliza una mano a formato de tabla (ej: 'AKs', 'AKo', 'AA')"""
         # Obtener valores
         def get_value(card):
@@ -536,6 +3668,33 @@ class PreflopStrategy:
             else:
                 return 'EP'  # Early Position (UTG, UTG+1, etc.)
     
+    def get_action_range(self, action: str, position: str) -> Optional[List[str]]:
+        """
+        Rango de manos (clases como 'AKs') con el que un jugador en `position` hace `action`
+        según la tabla MTT de 50 BB: 'raise' usa el rango de open raise, '3bet' y '4bet' los
+        de 3bet (el 4bet, el más cerrado) y 'all-in' el de push/fold.
+        Retorna None si no hay rango para esa acción (el jugador se trata como aleatorio).
+        """
+        table = self.preflop_table
+        if not table or action is None:
+            return None
+        hands = None
+        if action == 'raise':
+            hands_dict = table.get('open_raise', {}).get('50_bb', {}).get(position, {})
+            hands = hands_dict.get('raise') or hands_dict.get('defend')
+        elif action == '3bet':
+            hands_dict = table.get('vs_open_raise', {}).get('3bet_defend_50bb', {}).get(position, {})
+            hands = hands_dict.get('3bet')
+        elif action == '4bet':
+            ranges = [hands_dict.get('3bet') for hands_dict in
+                      table.get('vs_open_raise', {}).get('3bet_defend_50bb', {}).values()]
+            ranges = [hands for hands in ranges if hands]
+            hands = min(ranges, key=len) if ranges else None
+        elif action == 'all-in':
+            hands_dict = table.get('open_raise', {}).get('push_fold_6_10_bb', {}).get(position, {})
+            hands = hands_dict.get('all_in') or hands_dict.get('call_all_in')
+        return list(hands) if hands else None
+    
     def get_recommendation(self, card1: str, card2: str, position: str, num_players: int, 
                           has_raise: bool = False, num_raises: int = 0, stack_size: int = 50) -> str:
         """
@@ -844,10 +4003,21 @@ class PokerApp:
         # Datos de probabilidad para mostrar en la mesa
         self.current_probability = None
         self.current_top_losing_hands = []
-        
-        # Flag para cancelar cálculos en curso
+        self.current_samples = 0  # Repartos en los que se basa la probabilidad
+        self.current_error = None  # Mensaje si el último cálculo falló (por ejemplo, rangos imposibles)
+        
+        # Tiempo máximo por cálculo (segundos) y error estándar con el que se da por bueno
+        self.calculation_time_budget = 0.5
+        self.calculation_target_std_error = 0.0035
+        # Cada cuánto (segundos) se muestran los resultados parciales mientras se calcula
+        self.partial_update_interval = 0.1
+        # Muestreo cuasi-aleatorio: la misma precisión con menos simulaciones
+        self.calculation_sampling = 'qmc'
+        
+        # Flag y token para cancelar cálculos en curso
         self.calculation_in_progress = False
         self.calculation_thread = None
+        self.calculation_token = None
         
         # Timer para delay al recalcular cuando un jugador se retira
         self.fold_delay_timer = None
@@ -885,7 +4055,15 @@ class PokerApp:
             '♣': 'Tréboles'
         }
         
-        self.calculator = ProbabilityCalculator()
+        # Caché en disco: los resultados se reutilizan al reiniciar y entre varias instancias
+        try:
+            persistent_cache = PersistentEquityCache()
+        except (sqlite3.Error, OSError) as e:
+            print(f"No se pudo abrir la caché en disco ({e}); se usa solo la caché en memoria")
+            persistent_cache = None
+        self.calculator = ProbabilityCalculator(persistent_cache=persistent_cache)
+        # Arrancar ya los procesos de cálculo para que el primer cálculo no espere por ellos
+        warm_process_pool(self.calculator.evaluator.name)
         self.preflop_strategy = PreflopStrategy()
         
         # Recomendación preflop actual
@@ -1375,6 +4553,11 @@ class PokerApp:
                         x, prob_y, text=prob_text, fill=prob_color,
                         font=("Arial", 13, "bold"), tags=f"player_{i}_prob"
                     )
+                elif self.current_error:
+                    self.table_canvas.create_text(
+                        x, y + player_radius + 25, text=self.current_error, fill="#ef4444",
+                        font=("Arial", 9, "bold"), width=180, tags=f"player_{i}_prob"
+                    )
                 
                 # Mostrar recomendación preflop si no hay cartas comunitarias
                 if len(self.community_cards) == 0 and len(self.my_cards) == 2:
@@ -1859,6 +5042,7 @@ class PokerApp:
             self.update_probability()
         else:
             # Limpiar probabilidad si no hay suficientes cartas
+            self.cancel_calculation()
             self.current_probability = None
             self.current_top_losing_hands = []
             self.draw_table()
@@ -1873,6 +5057,7 @@ class PokerApp:
                 self.update_probability()
             else:
                 # Limpiar probabilidad si no hay suficientes cartas
+                self.cancel_calculation()
                 self.current_probability = None
                 self.current_top_losing_hands = []
                 self.draw_table()
@@ -2018,7 +5203,7 @@ class PokerApp:
         # Lista de manos
         y_offset = 35
         for i, (hand_name, count) in enumerate(self.current_top_losing_hands[:3]):
-            percentage = (count / 20000) * 100
+            percentage = (count / max(self.current_samples, 1)) * 100
             hand_text = f"{i+1}. {hand_name}: {percentage:.1f}%"
             
             # Fondo para cada mano
@@ -2359,6 +5544,7 @@ class PokerApp:
         self.community_cards = []
         self.folded_players = set()
         self.active_players = self.num_players
+        self.cancel_calculation()
         self.current_probability = None
         self.current_top_losing_hands = []
         self.previous_actions = {
@@ -2563,6 +5749,7 @@ class PokerApp:
         }
         
         # Limpiar datos de probabilidad
+        self.cancel_calculation()
         self.current_probability = None
         self.current_top_losing_hands = []
         
@@ -2575,39 +5762,51 @@ class PokerApp:
             self.calculate_and_display()
         else:
             # Limpiar probabilidad si no hay suficientes cartas
+            self.cancel_calculation()
             self.current_probability = None
             self.current_top_losing_hands = []
             self.draw_table()
     
+    def cancel_calculation(self):
+        """
+        Cancela el cálculo en curso, si hay alguno: el thread para en el siguiente punto de
+        control y sus resultados ya no se muestran. Se llama en todos los caminos que
+        abandonan un cálculo, no solo al empezar otro
+        """
+        self.calculation_in_progress = False
+        self.current_error = None
+        if self.calculation_token is not None:
+            self.calculation_token.cancel()
+            self.calculation_token = None
+    
     def calculate_and_display(self):
         """Calcula y muestra la probabilidad en un thread separado"""
+        # Cancelar cálculo anterior si existe (el thread para en el siguiente punto de control)
+        self.cancel_calculation()
         if len(self.my_cards) < 2:
             self.current_probability = None
             self.current_top_losing_hands = []
             self.draw_table()
             return
         
-        # Cancelar cálculo anterior si existe
-        self.calculation_in_progress = False
-        if self.calculation_thread and self.calculation_thread.is_alive():
-            # Esperar un momento para que termine el thread anterior
-            pass
-        
         # Mostrar indicador de cálculo
         self.current_probability = None
         self.current_top_losing_hands = []
+        self.current_error = None
         self.draw_table()  # Mostrar estado "calculando..."
         
         # Iniciar cálculo en thread separado
         self.calculation_in_progress = True
+        self.calculation_token = CancellationToken()
         self.calculation_thread = threading.Thread(
             target=self._calculate_probability_thread,
+            args=(self.calculation_token,),
             daemon=True
         )
         self.calculation_thread.start()
     
-    def _calculate_probability_thread(self):
-        """Ejecuta el cálculo en un thread separado"""
+    def _calculate_probability_thread(self, token: CancellationToken):
+        """Ejecuta el cálculo en un thread separado hasta que termine o se cancele token"""
         # Capturar valores actuales
         my_cards = self.my_cards.copy()
         community_cards = self.community_cards.copy()
@@ -2616,9 +5815,9 @@ class PokerApp:
         except (ValueError, AttributeError):
             self.num_players = 2
         
-        # Normalizar cartas (asegurar formato correcto)
-        my_cards = [self.normalize_card_format(c) for c in my_cards]
-        community_cards = [self.normalize_card_format(c) for c in community_cards]
+        # Normalizar cartas y convertirlas al modelo entero del calculador
+        my_cards = [card_to_int(self.normalize_card_format(c)) for c in my_cards]
+        community_cards = [card_to_int(self.normalize_card_format(c)) for c in community_cards]
         
         # Usar jugadores activos (los que no se han retirado)
         # Asegurar que el jugador 0 (tú) siempre se cuenta
@@ -2633,38 +5832,93 @@ class PokerApp:
         # El cálculo ya cuenta correctamente: num_players incluye a todos (tú + oponentes)
         # Por ejemplo, si hay 8 jugadores totales y 2 se retiran, active_players = 6
         # El cálculo simulará 5 oponentes (6 totales - 1 que eres tú)
-        probability, top_losing_hands = self.calculator.calculate_win_probability(
-            my_cards,
-            community_cards,
-            active_players,  # Usar jugadores activos, no totales
-            simulations=20000
-        )
+        # Con pocas cartas por salir la equity se calcula exacta en lugar de simularla.
+        # La simulación tiene un tiempo máximo (latencia fija aunque haya muchos jugadores)
+        # y para antes si ya alcanza la precisión de 20.000 simulaciones
+        # Los resultados parciales se muestran según llegan (como mucho cada
+        # partial_update_interval segundos) para tener un número útil cuanto antes
+        # Si se cancela (cambio de cartas o jugadores) el cálculo lanza CalculationCancelled
+        # en pocos milisegundos y el thread termina sin publicar nada
+        result = None
+        last_update = 0.0
+        try:
+            for result in self.calculator.iter_equity(
+                my_cards,
+                community_cards,
+                active_players,  # Usar jugadores activos, no totales
+                target_std_error=self.calculation_target_std_error,
+                time_budget=self.calculation_time_budget,
+                opponent_ranges=self.get_opponent_ranges(),
+                cancel_token=token,
+                sampling=self.calculation_sampling
+            ):
+                now = time.perf_counter()
+                if now - last_update >= self.partial_update_interval:
+                    self.root.after(0, self._update_probability_result, result, token)
+                    last_update = now
+        except CalculationCancelled:
+            return
+        except ValueError as e:
+            # Por ejemplo, rangos de los oponentes sin combinaciones compatibles con las cartas
+            self.root.after(0, self._show_calculation_error, str(e), token)
+            return
         
-        # Verificar que el cálculo no fue cancelado
-        if not self.calculation_in_progress:
+        if result is None:
             return
         
-        # Actualizar en el thread principal de tkinter
-        self.root.after(0, self._update_probability_result, probability, top_losing_hands)
+        # Actualizar en el thread principal de tkinter con el resultado final
+        self.root.after(0, self._update_probability_result, result, token)
+    
+    def get_opponent_ranges(self) -> list:
+        """
+        Rango de cada oponente activo según su acción marcada (por ejemplo, el rango de
+        open raise de su posición si subió). Los que no tienen acción con rango son aleatorios.
+        """
+        ranges = []
+        for player_id in range(1, self.num_players):
+            if player_id in self.folded_players:
+                continue
+            action = self.player_actions.get(player_id)
+            position = self.preflop_strategy.get_position(player_id, self.num_players, self.dealer_position)
+            hands = self.preflop_strategy.get_action_range(action, position)
+            ranges.append(HandRange.from_classes(hands) if hands else None)
+        return ranges
     
-    def _update_probability_result(self, probability, top_losing_hands):
+    def _update_probability_result(self, result, token: CancellationToken = None):
         """Actualiza el resultado en el thread principal"""
+        # Descartar resultados de un cálculo ya cancelado (pueden llegar después de cancelarlo)
+        if token is not None and token.cancelled:
+            return
         # Verificar que las cartas no hayan cambiado
         if len(self.my_cards) < 2:
             return
         
         # Guardar datos para mostrar en la mesa
-        self.current_probability = probability
-        self.current_top_losing_hands = top_losing_hands
+        self.current_probability = result.probability
+        self.current_top_losing_hands = result.top_losing_hands
+        self.current_samples = result.samples
         
         # Redibujar la mesa para mostrar la probabilidad y las manos
         self.draw_table()
+    
+    def _show_calculation_error(self, message: str, token: CancellationToken = None):
+        """Muestra en la mesa el error de un cálculo fallido (en el thread principal)"""
+        if token is not None and token.cancelled:
+            return
+        self.calculation_in_progress = False
+        self.current_probability = None
+        self.current_top_losing_hands = []
+        self.current_error = f"Error: {message}"
+        self.draw_table()
 
 
 def main():
     root = tk.Tk()
     app = PokerApp(root)
     root.mainloop()
+    # Al cerrar, aplicar el límite de la caché en disco y reducir el archivo
+    if app.calculator.persistent_cache is not None:
+        app.calculator.persistent_cache.compact()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+"""Tests de calculate_equity_batch frente a llamadas separadas a calculate_equity"""
+
+from poker_probability_calculator import ProbabilityCalculator, canonical_state, cards_to_ints, derive_seed
+
+RIVER = cards_to_ints(['2♠', '7♦', '9♣', 'J♥', 'Q♥'])
+TURN = cards_to_ints(['2♠', '7♦', '9♣', 'J♥'])
+HOLE_CARDS = [cards_to_ints(cards) for cards in (['A♠', 'K♥'], ['Q♣', 'Q♦'], ['8♥', 'T♥'], ['3♠', '3♦'],
+                                                 ['A♥', '5♥'], ['K♠', 'J♣'])]
+
+
+def make_calculator():
+    return ProbabilityCalculator(use_processes=False, use_preflop_table=False, cache_size=0)
+
+
+def test_batch_shared_enumeration_matches_separate_calls():
+    calculator = make_calculator()
+    scenarios = [(my_cards, RIVER, 2 + i % 2) for i, my_cards in enumerate(HOLE_CARDS)]
+    scenarios += [(my_cards, TURN, 2) for my_cards in HOLE_CARDS[:4]]
+    results = calculator.calculate_equity_batch(scenarios)
+    assert all(result.exact for result in results)
+    assert results == [calculator.calculate_equity(*scenario) for scenario in scenarios]
+
+
+def test_batch_simulation_matches_seeded_calls():
+    calculator = make_calculator()
+    flop = TURN[:3]
+    scenarios = [(my_cards, flop, 3) for my_cards in HOLE_CARDS[:3]]
+    results = calculator.calculate_equity_batch(scenarios, simulations=2000, seed=7)
+    for (my_cards, community_cards, num_players), result in zip(scenarios, results):
+        key = canonical_state(my_cards, community_cards) + (num_players,)
+        expected = calculator.calculate_equity(my_cards, community_cards, num_players, simulations=2000,
+                                               seed=derive_seed(7, *key))
+        assert not result.exact
+        assert result == expected
@@ -0,0 +1,87 @@
+"""Tests de las cachés de resultados de equity (en memoria y en disco)"""
+
+import sqlite3
+
+from poker_probability_calculator import (EquityResult, PersistentEquityCache, ProbabilityCalculator,
+                                          canonical_state, cards_to_ints, state_key_string)
+
+MY_CARDS = cards_to_ints(['A♠', 'K♥'])
+COMMUNITY_CARDS = cards_to_ints(['2♠', '7♦', '9♣'])
+NUM_PLAYERS = 3
+CACHE_KEY = (canonical_state(MY_CARDS, COMMUNITY_CARDS), NUM_PLAYERS, None)
+
+
+def make_calculator(**kwargs):
+    return ProbabilityCalculator(use_processes=False, use_preflop_table=False, **kwargs)
+
+
+def test_time_budget_does_not_reuse_imprecise_result():
+    calculator = make_calculator()
+    calculator.cache.put(CACHE_KEY, EquityResult(0.5, [], 2249, 0.0103, False))
+    result = calculator.calculate_equity(MY_CARDS, COMMUNITY_CARDS, NUM_PLAYERS,
+                                         target_std_error=0.0035, time_budget=0.3)
+    assert result.samples != 2249
+    assert result.std_error < 0.0103
+
+
+def test_time_budget_reuses_result_at_target():
+    calculator = make_calculator()
+    cached = EquityResult(0.5, [], 40000, 0.0025, False)
+    calculator.cache.put(CACHE_KEY, cached)
+    result = calculator.calculate_equity(MY_CARDS, COMMUNITY_CARDS, NUM_PLAYERS,
+                                         target_std_error=0.0035, time_budget=0.3)
+    assert result == cached
+
+
+def test_time_budget_reuses_result_with_budget_samples():
+    calculator = make_calculator()
+    budget_simulations = calculator.budget_simulations(0.3, NUM_PLAYERS)
+    cached = EquityResult(0.5, [], budget_simulations, 0.004, False)
+    calculator.cache.put(CACHE_KEY, cached)
+    result = calculator.calculate_equity(MY_CARDS, COMMUNITY_CARDS, NUM_PLAYERS,
+                                         target_std_error=0.001, time_budget=0.3)
+    assert result == cached
+
+
+def test_persistent_cache_replaces_worse_entry(tmp_path):
+    cache = PersistentEquityCache(str(tmp_path / 'equity.sqlite3'))
+    cache.put(CACHE_KEY, EquityResult(0.5, [], 2249, 0.0103, False))
+    calculator = make_calculator(cache_size=0, persistent_cache=cache)
+    result = calculator.calculate_equity(MY_CARDS, COMMUNITY_CARDS, NUM_PLAYERS,
+                                         target_std_error=0.0035, time_budget=0.3)
+    stored = cache.get(CACHE_KEY)
+    assert stored.samples == result.samples > 2249
+    assert stored.std_error < 0.0103
+    # Uno peor no sustituye al guardado
+    cache.put(CACHE_KEY, EquityResult(0.4, [], 100, 0.05, False))
+    assert cache.get(CACHE_KEY).samples == result.samples
+    cache.close()
+
+
+def test_persistent_cache_ignores_other_versions(tmp_path):
+    path = str(tmp_path / 'equity.sqlite3')
+    old = PersistentEquityCache(path, version=1)
+    old.put(CACHE_KEY, EquityResult(0.5, [], 20000, 0.003, False))
+    old.close()
+    cache = PersistentEquityCache(path, version=2)
+    assert cache.get(CACHE_KEY) is None
+    assert cache.compact() == 1
+    cache.close()
+    assert PersistentEquityCache(path, version=1).get(CACHE_KEY) is None
+
+
+def test_persistent_cache_discards_unversioned_file(tmp_path):
+    path = str(tmp_path / 'equity.sqlite3')
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE equity (state TEXT PRIMARY KEY, probability REAL NOT NULL, '
+                       'losing_hands TEXT NOT NULL, samples INTEGER NOT NULL, std_error REAL NOT NULL, '
+                       'exact INTEGER NOT NULL, last_used REAL NOT NULL)')
+    connection.execute("INSERT INTO equity VALUES (?, 0.5, '[]', 20000, 0.003, 0, 0)",
+                       (state_key_string(CACHE_KEY),))
+    connection.commit()
+    connection.close()
+    cache = PersistentEquityCache(path)
+    assert cache.get(CACHE_KEY) is None
+    cache.put(CACHE_KEY, EquityResult(0.5, [], 20000, 0.003, False))
+    assert cache.get(CACHE_KEY).samples == 20000
+    cache.close()
@@ -0,0 +1,17 @@
+"""Comprobación diferencial de los evaluadores frente al de referencia"""
+
+import itertools
+
+from poker_probability_calculator import random_hands, verify_evaluators
+
+
+def test_bitboard_matches_reference():
+    report = verify_evaluators('reference', 'bitboard', random_hands(20000, seed=1))
+    assert report['ok'], report['examples']
+
+
+def test_bitboard_matches_reference_on_two_suit_hands():
+    # Todas las manos de 5 cartas con solo 2 palos: colores, escaleras y ruedas
+    two_suits = [card for card in range(52) if card & 3 < 2]
+    report = verify_evaluators('reference', 'bitboard', itertools.combinations(two_suits, 5))
+    assert report['ok'], report['examples']
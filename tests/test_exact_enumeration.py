@@ -0,0 +1,44 @@
+"""Tests de calculate_exact frente a una enumeración por fuerza bruta"""
+
+import itertools
+from collections import Counter
+
+import pytest
+
+from poker_probability_calculator import PokerHandEvaluator, ProbabilityCalculator, cards_to_ints
+
+MY_CARDS = cards_to_ints(['A♠', 'K♥'])
+RIVER = cards_to_ints(['2♠', '7♦', '9♣', 'J♥', 'Q♥'])
+TURN = RIVER[:4]
+
+
+def brute_force_heads_up(my_cards, community_cards):
+    """Recorre todas las mesas y todas las manos del rival con itertools.combinations"""
+    deck = [card for card in range(52) if card not in my_cards + community_cards]
+    wins = 0
+    total = 0
+    losing_hands = Counter()
+    for runout in itertools.combinations(deck, 5 - len(community_cards)):
+        board = community_cards + list(runout)
+        my_strength = PokerHandEvaluator.evaluate_strength(my_cards + board)
+        rest = [card for card in deck if card not in runout]
+        for opponent in itertools.combinations(rest, 2):
+            strength = PokerHandEvaluator.evaluate_strength(list(opponent) + board)
+            total += 1
+            if strength > my_strength:
+                losing_hands[PokerHandEvaluator.hand_category(strength)] += 1
+            else:
+                wins += 1
+    return wins, total, losing_hands
+
+
+@pytest.mark.parametrize('community_cards', [RIVER, TURN], ids=['river', 'turn'])
+def test_exact_matches_brute_force_heads_up(community_cards):
+    calculator = ProbabilityCalculator(use_processes=False, use_preflop_table=False, cache_size=0)
+    result = calculator.calculate_exact(MY_CARDS, community_cards, 2)
+    wins, total, losing_hands = brute_force_heads_up(MY_CARDS, community_cards)
+    assert result.exact
+    assert result.samples == total
+    assert result.probability == wins / total
+    assert result.top_losing_hands == [(ProbabilityCalculator.HAND_NAMES[rank], count)
+                                       for rank, count in losing_hands.most_common(3)]
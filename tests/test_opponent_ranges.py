@@ -0,0 +1,13 @@
+"""Tests de la validación de los rangos de los oponentes"""
+
+import pytest
+
+from poker_probability_calculator import ProbabilityCalculator, cards_to_ints
+
+
+def test_range_without_possible_combos_raises():
+    calculator = ProbabilityCalculator(use_processes=False, use_preflop_table=False, cache_size=0)
+    with pytest.raises(ValueError):
+        # Con A♠ A♥ en mano y A♦ en la mesa ningún AA del rival es posible
+        calculator.calculate_equity(cards_to_ints(['A♠', 'A♥']), cards_to_ints(['A♦', '7♥', '9♦']), 2,
+                                    opponent_ranges=[['AA']], simulations=1000)
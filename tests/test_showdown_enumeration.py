@@ -0,0 +1,58 @@
+"""Tests de calculate_showdown frente a una enumeración por fuerza bruta"""
+
+import itertools
+
+import pytest
+
+from poker_probability_calculator import (PokerHandEvaluator, ProbabilityCalculator, cards_to_ints,
+                                          suit_symmetries)
+
+FLOP = cards_to_ints(['2♣', '7♦', '9♣'])
+TURN = cards_to_ints(['2♣', '7♦', '9♣', 'J♥'])
+
+CASES = {
+    'turn': ([['A♠', 'K♥'], ['Q♣', 'Q♦']], TURN),
+    # ♠ <-> ♥ deja iguales las manos y la mesa: se enumera la mitad de las mesas con peso
+    'flop-symmetric': ([['A♠', 'A♥'], ['K♠', 'K♥']], FLOP),
+    'flop-symmetric-3way': ([['A♠', 'A♥'], ['K♠', 'K♥'], ['Q♠', 'Q♥']], FLOP),
+}
+
+
+def brute_force_showdown(hands, community_cards):
+    """Recorre todas las mesas con itertools.combinations y reparte el bote entre los empatados"""
+    known = community_cards + [card for hand in hands for card in hand]
+    deck = [card for card in range(52) if card not in known]
+    wins = [0] * len(hands)
+    ties = [0] * len(hands)
+    shares = [0.0] * len(hands)
+    total = 0
+    for runout in itertools.combinations(deck, 5 - len(community_cards)):
+        board = community_cards + list(runout)
+        strengths = [PokerHandEvaluator.evaluate_strength(hand + board) for hand in hands]
+        best = max(strengths)
+        winners = [seat for seat, strength in enumerate(strengths) if strength == best]
+        for seat in winners:
+            if len(winners) == 1:
+                wins[seat] += 1
+            else:
+                ties[seat] += 1
+            shares[seat] += 1 / len(winners)
+        total += 1
+    return wins, ties, shares, total
+
+
+@pytest.mark.parametrize('case', list(CASES))
+def test_showdown_matches_brute_force(case):
+    hands, community_cards = CASES[case]
+    hands = [cards_to_ints(hand) for hand in hands]
+    if case.startswith('flop-symmetric'):
+        assert suit_symmetries(hands + [community_cards])
+    calculator = ProbabilityCalculator(use_processes=False, use_preflop_table=False, cache_size=0)
+    result = calculator.calculate_showdown(hands, community_cards)
+    wins, ties, shares, total = brute_force_showdown(hands, community_cards)
+    assert result.exact
+    assert result.samples == total
+    for seat, seat_result in enumerate(result.seats):
+        assert seat_result.win == wins[seat] / total
+        assert seat_result.tie == ties[seat] / total
+        assert seat_result.equity == pytest.approx(shares[seat] / total)